@@ -13,6 +13,7 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 # ✅ Import your models and engine
 from models.user import User
 from models.blog_post import BlogPost
+from models.news_sentiment import NewsSentiment
 from sqlmodel import SQLModel
 from db import engine
 
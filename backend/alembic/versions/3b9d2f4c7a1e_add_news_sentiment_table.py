@@ -0,0 +1,42 @@
+"""Add news_sentiment table
+
+Revision ID: 3b9d2f4c7a1e
+Revises: 0720a7f90fae
+Create Date: 2026-10-17 09:12:41.205317
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b9d2f4c7a1e'
+down_revision: Union[str, None] = '0720a7f90fae'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'news_sentiment',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('symbol', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column('decision', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column('score', sa.Float(), nullable=False),
+        sa.Column('article_count', sa.Integer(), nullable=False),
+        sa.Column('fetched_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_news_sentiment_symbol'), 'news_sentiment', ['symbol'], unique=True)
+    op.create_index(op.f('ix_news_sentiment_fetched_at'), 'news_sentiment', ['fetched_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_news_sentiment_fetched_at'), table_name='news_sentiment')
+    op.drop_index(op.f('ix_news_sentiment_symbol'), table_name='news_sentiment')
+    op.drop_table('news_sentiment')
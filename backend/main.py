@@ -1,5 +1,6 @@
 import os
 import sys
+from contextlib import asynccontextmanager
 from dotenv import load_dotenv
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
@@ -19,13 +20,30 @@ from routers import (
     analysis_medium,
     analysis_long,
     chart_data,
+    screener,
+    backtest,
     admin,
     blog,     # includes its own prefix="/api" inside blog.py
     auth,
     oauth,
 )
 
-app = FastAPI()
+# ✅ Background news ingestion (NEWS_INGEST_ENABLED=true)
+from backend.services import news_ingest
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if news_ingest.NEWS_INGEST_ENABLED:
+        news_ingest.start()
+    try:
+        yield
+    finally:
+        if news_ingest.NEWS_INGEST_ENABLED:
+            news_ingest.stop()
+
+
+app = FastAPI(lifespan=lifespan)
 init_db()
 
 # ✅ Register routers (include each ONCE)
@@ -33,6 +51,8 @@ app.include_router(analysis_short.router)
 app.include_router(analysis_medium.router)
 app.include_router(analysis_long.router)
 app.include_router(chart_data.router)
+app.include_router(screener.router)
+app.include_router(backtest.router)
 app.include_router(admin.router)
 app.include_router(blog.router)   # <-- blog.py already has prefix="/api"
 app.include_router(auth.router)
@@ -1,2 +1,3 @@
 from .user import User
 from .blog_post import BlogPost, BlogPostCreate
+from .news_sentiment import NewsSentiment
@@ -0,0 +1,18 @@
+# models/news_sentiment.py
+from sqlmodel import SQLModel, Field
+from typing import Optional
+from datetime import datetime
+
+
+# ✅ Latest aggregate news sentiment per symbol
+class NewsSentiment(SQLModel, table=True):
+    __tablename__ = "news_sentiment"
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    symbol: str = Field(index=True, unique=True)
+
+    decision: str                     # e.g. "🟢 Positive News - Consider Buying"
+    score: float                      # average polarity of the scored articles
+    article_count: int = Field(default=0)
+
+    fetched_at: datetime = Field(default_factory=datetime.utcnow, index=True)
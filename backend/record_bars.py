@@ -0,0 +1,82 @@
+# record_bars.py
+#
+# Record OHLCV bars into the replay fixtures (REPLAY_DATA_DIR, fixtures/bars by
+# default) so the API can run offline with MARKET_DATA_PROVIDER=replay:
+#
+#   python record_bars.py AAPL MSFT VOD.L --period 2y --interval 1d --interval 60m
+#
+# --synthetic writes seeded random-walk bars instead of downloading; that is how
+# the small fixture set shipped in the repo was made.
+import argparse
+import os
+import sys
+import zlib
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import numpy as np
+import pandas as pd
+
+from backend.services.bar_cache import period_start
+from backend.services.market_data import PROVIDERS, ReplayProvider
+
+# Regular session is 6.5h; the last bar of the day may be partial, as with yfinance
+INTRADAY_MINUTES = {"15m": 15, "30m": 30, "60m": 60, "1h": 60}
+
+
+def synthetic_bars(symbol: str, interval: str, period: str, end: pd.Timestamp) -> pd.DataFrame:
+    rng = np.random.default_rng(zlib.crc32(f"{symbol}:{interval}".encode()))
+    days = pd.bdate_range(period_start(period, now=end), end.normalize())
+    if interval in INTRADAY_MINUTES:
+        bars_per_day = -(-390 // INTRADAY_MINUTES[interval])
+        index = pd.DatetimeIndex([
+            day + pd.Timedelta(hours=13, minutes=30 + i * INTRADAY_MINUTES[interval])
+            for day in days for i in range(bars_per_day)
+        ], tz="UTC", name="Datetime")
+        vol = 0.02 / np.sqrt(bars_per_day)
+    else:
+        index = days.rename("Date")
+        vol = 0.02
+
+    close = 50 + 150 * rng.random() * np.exp(np.cumsum(rng.normal(0.0003, vol, len(index))))
+    open_ = np.concatenate([[close[0]], close[:-1]]) * (1 + rng.normal(0, vol / 4, len(index)))
+    spread = np.abs(rng.normal(0, vol / 2, len(index))) * close
+    return pd.DataFrame({
+        "Open": open_.round(2),
+        "High": (np.maximum(open_, close) + spread).round(2),
+        "Low": (np.minimum(open_, close) - spread).round(2),
+        "Close": close.round(2),
+        "Volume": rng.integers(1_000_000, 20_000_000, len(index)),
+    }, index=index)
+
+
+def record(symbols, intervals, period, provider_name="yfinance", synthetic=False, end=None):
+    recorder = ReplayProvider()
+    provider = None if synthetic else PROVIDERS[provider_name]()
+    end = pd.Timestamp(end) if end else pd.Timestamp.now("UTC").tz_localize(None)
+
+    for interval in intervals:
+        for symbol in symbols:
+            if synthetic:
+                df = synthetic_bars(symbol, interval, period, end)
+            else:
+                df = provider.download(symbol, interval, period=period)
+            if df is None or df.empty:
+                print(f"[WARN] No bars for {symbol} ({interval})")
+                continue
+            recorder.record(symbol, interval, df)
+            print(f"[SUCCESS] Recorded {len(df)} bars for {symbol} ({interval})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Record OHLCV bars for the replay market-data provider")
+    parser.add_argument("symbols", nargs="+", help="Provider symbols, with exchange suffix (e.g. VOD.L)")
+    parser.add_argument("--period", default="2y")
+    parser.add_argument("--interval", action="append", dest="intervals", help="Repeatable; default 1d")
+    parser.add_argument("--provider", default="yfinance", choices=sorted(set(PROVIDERS) - {"replay"}))
+    parser.add_argument("--synthetic", action="store_true", help="Write seeded random-walk bars instead of downloading")
+    parser.add_argument("--end", help="Last day for --synthetic bars (default today)")
+    args = parser.parse_args()
+
+    record(args.symbols, args.intervals or ["1d"], args.period, args.provider, args.synthetic, args.end)
+    print(f"✅ Done. Replay with MARKET_DATA_PROVIDER=replay (REPLAY_DATA_DIR={os.path.abspath(ReplayProvider().root)})")
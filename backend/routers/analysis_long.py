@@ -1,19 +1,53 @@
 # backend/routers/analysis_long.py
 
 from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
-from typing import List
+from pydantic import BaseModel, Field
+from typing import Dict, List, Literal
+import hashlib
+import os
 import numpy as np
-import yfinance as yf
 import pandas as pd
+from backend.services.bar_cache import Period
+from backend.services.data_service import fetch_many
+from backend.services.helpers.cache import TTLCache
 from backend.services.indicators import get_sma200_and_volatility
+from backend.services.monte_carlo import STREAM_KEEP_PATHS, percentile_bands, simulate_from_closes, simulate_portfolio
+from backend.services.worker_pool import MAX_PARALLEL_SYMBOLS, SIMULATION_WORKERS, map_bounded
 
 router = APIRouter()
 
+MAX_SAMPLE_PATHS = 50
+
+# 🗃 Simulation results per (symbol, last bar date, parameters), bounded by the bytes of stored paths
+LONGTERM_CACHE_BYTES = int(os.getenv("LONGTERM_CACHE_MB", 512)) * 1024 * 1024
+LONGTERM_CACHE_TTL = float(os.getenv("LONGTERM_CACHE_TTL", 24 * 3600))
+_simulation_cache = TTLCache(ttl=LONGTERM_CACHE_TTL, maxsize=LONGTERM_CACHE_BYTES,
+                             sizeof=lambda entry: entry["price_paths"].nbytes)
+
+# 🌊 Runs whose full path matrix would exceed this switch to chunked streaming automatically
+STREAMING_THRESHOLD_BYTES = int(os.getenv("MC_STREAMING_THRESHOLD_MB", 256)) * 1024 * 1024
+# Streaming still keeps one end price per path, so the path count itself is capped (8MB of float64 per million)
+MAX_SIMULATIONS = int(os.getenv("MC_MAX_SIMULATIONS", 1_000_000))
+
 class LongTermRequest(BaseModel):
     symbols: List[str]
-    period: str = "5y"
-    simulations: int = 1000
+    period: Period = "5y"
+    simulations: int = Field(1000, ge=1, le=MAX_SIMULATIONS)
+    # "paths" ships every simulated path, "bands" only per-day percentiles plus a few samples
+    response_mode: Literal["paths", "bands"] = "paths"
+    sample_paths: int = Field(0, ge=0, le=MAX_SAMPLE_PATHS)
+    horizon_days: int = Field(252, ge=2, le=252 * 10)
+    # Portfolio mode: simulate all symbols jointly with correlated shocks (equal weights by default)
+    portfolio: bool = False
+    weights: List[float] | None = None
+    # Variance reduction; with a tolerance, `simulations` becomes the batch size and batches are
+    # added until the 5th/95th percentile end prices are within +/- tolerance * current price
+    sampling: Literal["pseudo", "antithetic", "sobol"] = "pseudo"
+    tolerance: float | None = Field(None, gt=0)
+    max_simulations: int = Field(20000, ge=1, le=MAX_SIMULATIONS)
+    # Streaming keeps only end prices plus a fixed sample of paths, so memory no longer grows with days * paths
+    streaming: bool = False
+    precision: Literal["float64", "float32"] = "float64"
 
 class StockSimulationResult(BaseModel):
     symbol: str
@@ -21,12 +55,25 @@ class StockSimulationResult(BaseModel):
     worst_case: float
     best_case: float
     decision: str
-    price_paths: List[List[float]]
+    simulations: int | None = None
+    price_paths: List[List[float]] | None = None  # day-major: price_paths[day][simulation]
+    bands: Dict[str, List[float]] | None = None   # "p5", "p25", "p50", "p75", "p95" per day
     sma200: float | None = None
     volatility: float | None = None
 
+class PortfolioSimulationResult(BaseModel):
+    symbols: List[str]
+    weights: List[float]
+    expected_return: float   # % change of the mean simulated end value
+    worst_case: float        # 5th percentile end return, %
+    median: float            # 50th percentile end return, %
+    best_case: float         # 95th percentile end return, %
+    decision: str
+    bands: Dict[str, List[float]]  # portfolio value per day, starting at 100
+
 class LongTermResponse(BaseModel):
     results: List[StockSimulationResult]
+    portfolio: PortfolioSimulationResult | None = None
     
 def safe_float(val):
     if pd.isna(val) or np.isnan(val) or np.isinf(val):
@@ -34,35 +81,103 @@ def safe_float(val):
     return float(val)
 
 
-def monte_carlo_simulation(data, days=252, simulations=1000):
-    returns = data['Close'].pct_change().dropna()
-    mean_return = returns.mean()
-    std_dev = returns.std()
-
-    last_price = data['Close'].iloc[-1]
-    price_paths = np.zeros((days, simulations))
-    price_paths[0] = last_price
-
-    for t in range(1, days):
-        random_returns = np.random.normal(mean_return, std_dev, simulations)
-        price_paths[t] = price_paths[t - 1] * (1 + random_returns)
-
-    worst_case = np.percentile(price_paths[-1], 5)
-    best_case = np.percentile(price_paths[-1], 95)
-    return price_paths.tolist(), worst_case, best_case
+def simulation_seed(key) -> int:
+    # Stable across processes (unlike hash()), so a cache miss reproduces the same paths
+    return int.from_bytes(hashlib.sha256(repr(key).encode()).digest()[:8], "little")
+
+
+def portfolio_simulation(frames, symbols, weights, days, simulations, streaming=False, precision="float64"):
+    closes = pd.concat({symbol: frames[symbol]['Close'] for symbol in symbols}, axis=1).dropna()
+    if len(closes) < 3:
+        raise HTTPException(status_code=400, detail="Not enough overlapping history to estimate correlations.")
+
+    # Same memory rules as the single-asset runs: bands come from a fixed sample when streaming
+    values, end_values = simulate_portfolio(
+        closes, weights, days, simulations, rng=np.random.default_rng(),
+        keep_paths=STREAM_KEEP_PATHS if streaming else None, dtype=precision,
+    )
+    end_returns = end_values.astype(float) - 100.0
+    worst_case, median, best_case = np.percentile(end_returns, [5, 50, 95])
+
+    if worst_case > -10:
+        decision = "Buy"
+    elif worst_case > -25:
+        decision = "Hold"
+    else:
+        decision = "Sell"
+
+    return PortfolioSimulationResult(
+        symbols=symbols,
+        weights=[float(w) for w in weights],
+        expected_return=round(float(end_returns.mean()), 2),
+        worst_case=round(float(worst_case), 2),
+        median=round(float(median), 2),
+        best_case=round(float(best_case), 2),
+        decision=decision,
+        bands=percentile_bands(values),
+    )
 
 @router.post("/longterm", response_model=LongTermResponse)
 def long_term_analysis(req: LongTermRequest):
     results = []
 
+    if req.weights is not None and len(req.weights) != len(req.symbols):
+        raise HTTPException(status_code=400, detail="weights must have one entry per symbol.")
+    if req.weights is not None and (min(req.weights) < 0 or sum(req.weights) <= 0):
+        raise HTTPException(status_code=400, detail="weights must be non-negative and not all zero.")
+    if req.portfolio:
+        # A repeated symbol would collapse into one price column while keeping its own weight
+        duplicates = sorted({s for s in req.symbols if req.symbols.count(s) > 1})
+        if duplicates:
+            raise HTTPException(status_code=422, detail=f"Portfolio symbols must be unique; repeated: {', '.join(duplicates)}")
+
+    frames, _ = fetch_many(req.symbols, period=req.period, interval="1d")
+
+    max_paths = max(req.simulations, req.max_simulations if req.tolerance is not None else 0)
+    path_bytes = req.horizon_days * max_paths * np.dtype(req.precision).itemsize
+    streaming = req.streaming or path_bytes > STREAMING_THRESHOLD_BYTES
+
+    # Look up cached results first, then fan the misses out over the simulation pool
+    entries, misses = {}, []
     for symbol in req.symbols:
-        stock = yf.Ticker(symbol)
-        df = stock.history(period=req.period)
+        df = frames.get(symbol)
+        if df is None or df.empty or 'Close' not in df.columns or symbol in entries:
+            continue
+
+        cache_key = (
+            symbol, str(df.index[-1].date()), req.period, req.simulations,
+            req.horizon_days, req.sampling, req.tolerance, req.max_simulations, streaming, req.precision,
+        )
+        entries[symbol] = _simulation_cache.get(cache_key)
+        if entries[symbol] is None:
+            misses.append((symbol, cache_key))
+        else:
+            print(f"[CACHE] Long-term simulation hit for {symbol}")
+
+    jobs = [
+        (frames[symbol]['Close'].to_numpy(dtype=float), req.horizon_days, req.simulations,
+         req.sampling, req.tolerance, req.max_simulations, simulation_seed(cache_key), streaming, req.precision)
+        for symbol, cache_key in misses
+    ]
+    simulated = map_bounded("simulation", SIMULATION_WORKERS, simulate_from_closes, jobs, MAX_PARALLEL_SYMBOLS)
+
+    for (symbol, cache_key), (price_paths, worst_case, best_case, simulations) in zip(misses, simulated):
+        sma200, volatility = get_sma200_and_volatility(symbol, period="1y", exchange="")
+        price_paths.setflags(write=False)  # shared by every later hit
+        entries[symbol] = {
+            "price_paths": price_paths, "worst_case": worst_case, "best_case": best_case,
+            "simulations": simulations, "sma200": sma200, "volatility": volatility,
+        }
+        _simulation_cache.set(cache_key, entries[symbol])
 
-        if df.empty or 'Close' not in df.columns:
+    for symbol in req.symbols:
+        cached = entries.get(symbol)
+        if cached is None:
             continue
 
-        price_paths, worst_case, best_case = monte_carlo_simulation(df, simulations=req.simulations)
+        df = frames[symbol]
+        price_paths, worst_case, best_case = cached["price_paths"], cached["worst_case"], cached["best_case"]
+        sma200, volatility = cached["sma200"], cached["volatility"]
         current_price = df['Close'].iloc[-1]
 
         if worst_case > current_price * 0.9:
@@ -71,8 +186,14 @@ def long_term_analysis(req: LongTermRequest):
             decision = "Hold"
         else:
             decision = "Sell"
-            
-        sma200, volatility = get_sma200_and_volatility(symbol, period="1y", exchange="")
+
+        simulations = cached["simulations"]
+        if req.response_mode == "bands":
+            bands = percentile_bands(price_paths)
+            price_paths = price_paths[:, :req.sample_paths].tolist() if req.sample_paths else None
+        else:
+            bands = None
+            price_paths = price_paths.tolist()
 
         results.append(StockSimulationResult(
             symbol=symbol,
@@ -82,10 +203,21 @@ def long_term_analysis(req: LongTermRequest):
             sma200=safe_float(sma200),
             volatility=safe_float(volatility),
             decision=decision,
-            price_paths=price_paths
+            simulations=simulations,
+            price_paths=price_paths,
+            bands=bands
         ))
 
     if not results:
         raise HTTPException(status_code=404, detail="No valid stock data found.")
 
-    return LongTermResponse(results=results)
+    portfolio = None
+    if req.portfolio:
+        missing = [symbol for symbol in req.symbols if symbol not in frames]
+        if missing:
+            raise HTTPException(status_code=400, detail=f"No valid stock data for portfolio symbols: {', '.join(missing)}")
+        weights = np.asarray(req.weights if req.weights is not None else [1.0] * len(req.symbols))
+        portfolio = portfolio_simulation(frames, req.symbols, weights / weights.sum(), req.horizon_days, req.simulations,
+                                         streaming=streaming, precision=req.precision)
+
+    return LongTermResponse(results=results, portfolio=portfolio)
@@ -1,84 +1,108 @@
-from fastapi import APIRouter
+import asyncio
+from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
-from backend.services.lstm_model import predict_lstm
+from backend.services.bar_cache import Period
+from backend.services.data_service import apply_exchange_suffix
+from backend.services.prediction_jobs import get_job, job_status, prediction_outcome, submit_job
 
 router = APIRouter(prefix="/medium", tags=["Medium-Term Analysis"])
 
 class MediumTermRequest(BaseModel):
     symbol: str
-    period: str
+    period: Period
     epochs: int = 5
     future_days: int = 30
     exchange: str
     asset_type: str
 
-# 👉 ADD THIS small function right **below** your `MediumTermRequest` class (before @router.post)
-def apply_exchange_suffix(symbol: str, exchange: str) -> str:
-    if exchange == "LSE" and not symbol.endswith(".L"):
-        return f"{symbol}.L"
-    if exchange == "NSE" and not symbol.endswith(".NS"):
-        return f"{symbol}.NS"
-    if exchange == "BSE" and not symbol.endswith(".BO"):
-        return f"{symbol}.BO"
-    if exchange == "HKEX" and not symbol.endswith(".HK"):
-        return f"{symbol}.HK"
-    return symbol
+def format_prediction(symbol: str, future_days: int, result):
+    if result is None or (isinstance(result, tuple) and len(result) == 2):
+        error_message = result[1] if isinstance(result, tuple) else "Unknown Error"
+        return {
+            "symbol": symbol,
+            "error": error_message
+        }
 
-@router.post("/predict")
-async def predict_medium_term(data: MediumTermRequest):
-    print("📥 Incoming medium-term request:", data.dict())
+    # ✅ Now unpacking 7 values (new version)
+    predicted_prices, summary, confidence, chart_base64, upper_bounds, lower_bounds, current_price = result
 
-    symbol_list = [s.strip().upper() for s in data.symbol.split(",")]
+    chart_data = [
+        {
+            "day": i + 1,
+            "price": float(predicted_prices[i]),
+            "upper": float(upper_bounds[i]),
+            "lower": float(lower_bounds[i])
+        }
+        for i in range(len(predicted_prices))
+    ]
+
+    return {
+        "symbol": symbol,  # Keep original symbol for display
+        "predicted_prices": predicted_prices,
+        "future_days": future_days,
+        "trend": summary["trend"],
+        "recommendation": summary["recommendation"],
+        "percentage_change": summary["percentage_change"],
+        "start_price": summary["start_price"],
+        "end_price": summary["end_price"],
+        "current_price": current_price,
+        "chart_data": chart_data,
+        "confidence": f"{confidence}%",
+        "chart_base64": chart_base64,
+        "upper_bounds": upper_bounds,
+        "lower_bounds": lower_bounds
+    }
 
-    all_predictions = []
+def start_job(data: MediumTermRequest, track: bool = True) -> dict:
+    symbol_list = [s.strip().upper() for s in data.symbol.split(",")]
 
+    symbols = []
     for symbol in symbol_list:
         # ✅ UPDATE HERE: apply suffix
         smart_symbol = apply_exchange_suffix(symbol, data.exchange)
         print(f"🔥 Predicting for: {smart_symbol} (Original: {symbol})")
+        symbols.append((symbol, smart_symbol))
 
-        result = predict_lstm(
-            symbol=smart_symbol,
-            period=data.period,
-            future_days=data.future_days
-        )
+    # Training runs on the worker pool; identical symbols already in progress are shared
+    return submit_job(symbols, data.period, data.future_days, track=track)
 
-        if result is None or (isinstance(result, tuple) and len(result) == 2):
-            error_message = result[1] if isinstance(result, tuple) else "Unknown Error"
-            all_predictions.append({
-                "symbol": symbol,
-                "error": error_message
-            })
-            continue
+@router.post("/predict")
+async def predict_medium_term(data: MediumTermRequest):
+    print("📥 Incoming medium-term request:", data.dict())
 
-        # ✅ Now unpacking 7 values (new version)
-        predicted_prices, summary, confidence, chart_base64, upper_bounds, lower_bounds, current_price = result
+    # Answered inline, so the job isn't kept for polling
+    job = start_job(data, track=False)
+    # Wait without blocking the event loop
+    await asyncio.gather(*(asyncio.wrap_future(future) for _, future in job["predictions"]), return_exceptions=True)
 
-        chart_data = [
-            {
-                "day": i + 1,
-                "price": float(predicted_prices[i]),
-                "upper": float(upper_bounds[i]),
-                "lower": float(lower_bounds[i])
-            }
-            for i in range(len(predicted_prices))
-        ]
+    return [
+        format_prediction(symbol, data.future_days, prediction_outcome(future))
+        for symbol, future in job["predictions"]
+    ]
+
+@router.post("/jobs")
+async def submit_medium_term_job(data: MediumTermRequest):
+    print("📥 Incoming medium-term job:", data.dict())
+    job = start_job(data)
+    return {"job_id": job["job_id"], "status": job_status(job)}
 
-        all_predictions.append({
-            "symbol": symbol,  # Keep original symbol for display
-            "predicted_prices": predicted_prices,
-            "future_days": data.future_days,
-            "trend": summary["trend"],
-            "recommendation": summary["recommendation"],
-            "percentage_change": summary["percentage_change"],
-            "start_price": summary["start_price"],
-            "end_price": summary["end_price"],
-            "current_price": current_price,
-            "chart_data": chart_data,
-            "confidence": f"{confidence}%",
-            "chart_base64": chart_base64,
-            "upper_bounds": upper_bounds,
-            "lower_bounds": lower_bounds
-        })
+@router.get("/jobs/{job_id}")
+async def medium_term_job(job_id: str):
+    job = get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found or expired.")
 
-    return all_predictions
+    status = job_status(job)
+    response = {
+        "job_id": job_id,
+        "status": status,
+        "symbols": [symbol for symbol, _ in job["predictions"]],
+        "created_at": job["created_at"],
+        "finished_at": job["finished_at"],
+    }
+    if status == "done":
+        response["results"] = [
+            format_prediction(symbol, job["future_days"], prediction_outcome(future))
+            for symbol, future in job["predictions"]
+        ]
+    return response
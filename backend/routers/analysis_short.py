@@ -2,10 +2,17 @@
 
 from fastapi import APIRouter
 from pydantic import BaseModel
-from backend.services.indicators import calculate_rsi, calculate_atr
-from backend.services.data_service import fetch_stock_data
-from backend.services.sentiment import get_news_decision
-import yfinance as yf
+from backend.services.helpers.technical_indicators import compute_frame_indicators
+from backend.services.data_service import fetch_many
+from backend.services.sentiment import get_news_decisions, record_interest
+from backend.services.short_term_rules import (
+    CONFIDENCE_LABELS,
+    DECISION_LABELS,
+    TREND_LABELS,
+    classify_trend,
+    news_sentiment_score,
+    score_signals,
+)
 import math
 
 router = APIRouter()
@@ -25,17 +32,6 @@ class ShortTermRequest(BaseModel):
     asset_type: str
     risk_tolerance: float = 1.0
 
-def apply_exchange_suffix(symbol: str, exchange: str) -> str:
-    if exchange == "LSE" and not symbol.endswith(".L"):
-        return f"{symbol}.L"
-    if exchange == "NSE" and not symbol.endswith(".NS"):
-        return f"{symbol}.NS"
-    if exchange == "BSE" and not symbol.endswith(".BO"):
-        return f"{symbol}.BO"
-    if exchange == "HKEX" and not symbol.endswith(".HK"):
-        return f"{symbol}.HK"
-    return symbol
-
 @router.post("/api/short-term-predict")
 def short_term_predict(data: ShortTermRequest):
     try:
@@ -47,28 +43,27 @@ def short_term_predict(data: ShortTermRequest):
     results = []
     all_final_decisions = []
 
+    frames, errors = fetch_many(symbol_list, data.exchange, period="1mo", interval="1d")
+    # News for every symbol with bars, fetched concurrently under one deadline
+    with_bars = [symbol for symbol in symbol_list if symbol in frames]
+    record_interest(with_bars)
+    news = get_news_decisions(with_bars)
+
     for symbol in symbol_list:
-        smart_symbol = apply_exchange_suffix(symbol, data.exchange)
-        stock = yf.Ticker(smart_symbol)
-        df = stock.history(period="1mo", interval="1d")
+        df = frames.get(symbol)
 
         if df is None or df.empty or "Close" not in df.columns:
-            results.append({"symbol": symbol, "error": "No data found"})
+            results.append({"symbol": symbol, "error": errors.get(symbol, "No data found")})
             continue
 
         df = df.dropna(subset=["Close", "Volume"])
-        df['SMA50'] = df['Close'].rolling(window=50).mean()
-        df['SMA200'] = df['Close'].rolling(window=200).mean()
-        df = calculate_rsi(df)
-        df['Volatility'] = df['Close'].pct_change().rolling(14).std()
+        ind = compute_frame_indicators(df, ("rsi", "volatility", "atr"))
 
         current_price = df['Close'].iloc[-1]
         predicted_price = current_price * 1.02
-        rsi = df['RSI'].iloc[-1]
-        volatility = df['Volatility'].iloc[-1]
-
-        atr_data = calculate_atr(df)
-        atr = atr_data['ATR'].iloc[-1]
+        rsi = ind["rsi"][-1]
+        volatility = ind["volatility"][-1]
+        atr = ind["atr"][-1]
         stop_loss = current_price - (atr * 1.5 * (2 - data.risk_tolerance))
         take_profit = current_price + (atr * 2.5 * data.risk_tolerance)
 
@@ -78,50 +73,18 @@ def short_term_predict(data: ShortTermRequest):
         volume_spike_str = f"{volume_spike:+.1f}% vs avg"
 
         last_3 = df["Close"].tail(3).tolist()
-        if last_3[2] > last_3[1] > last_3[0]:
-            trend = "3D Bullish"
-        elif last_3[2] < last_3[1] < last_3[0]:
-            trend = "3D Bearish"
-        elif last_3[2] > last_3[1] < last_3[0]:
-            trend = "Rebound forming"
-        else:
-            trend = "Flat or No Clear Trend"
-
-        news_decision, sentiment = get_news_decision(symbol)
-        sentiment_score = 88 if "Positive" in news_decision else (70 if "Neutral" in news_decision else 50)
-
-        confidence = "🔴 Low"
-        if sentiment_score >= 85 and volume_spike > 50 and "Bullish" in trend and rsi < 70:
-            confidence = "🟢 High"
-        elif sentiment_score >= 70 and volume_spike > 10 and "Bullish" in trend:
-            confidence = "🟡 Medium"
-        elif "Rebound" in trend and sentiment_score >= 70 and rsi < 65:
-            confidence = "🟡 Medium"
-        elif "Rebound" in trend and "Positive" in news_decision and rsi < 75 and volume_spike > -70:
-            confidence = "🟡 Medium"
-        elif "Positive" in news_decision and volume_spike > -50:
-            confidence = "🟡 Medium"
-
-        score = 0
-        if "Bullish" in trend: score += 2
-        if rsi < 30: score += 1
-        if sentiment_score > 80: score += 2
-        if volume_spike > 10: score += 1
-        if confidence == "🟢 High": score += 2
-        if confidence == "🟡 Medium": score += 1
-        if "Rebound" in trend and rsi < 40: score += 1
-
-        if volume_spike < -50 or ("Bearish" in trend and confidence == "🔴 Low"):
-            final_decision = "❌ Avoid (Low Interest or Bearish)"
-        else:
-            if score >= 6:
-                final_decision = "🚀 Invest Strongly"
-            elif score >= 4:
-                final_decision = "✅ Invest"
-            elif score >= 2:
-                final_decision = "🤔 Review Further"
-            else:
-                final_decision = "❌ Avoid"
+        trend_code = classify_trend(*last_3)
+        trend = TREND_LABELS[trend_code]
+
+        news_decision, sentiment = news[symbol]
+        sentiment_score = news_sentiment_score(news_decision)
+
+        score, confidence_code, decision_code = score_signals(
+            trend_code, rsi, volume_spike, sentiment_score, "Positive" in news_decision
+        )
+        score = int(score)
+        confidence = CONFIDENCE_LABELS[confidence_code]
+        final_decision = DECISION_LABELS[decision_code]
 
         all_final_decisions.append((symbol, score, final_decision))
 
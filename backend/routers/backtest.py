@@ -0,0 +1,36 @@
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel, Field
+from typing import List, Literal
+from backend.services.bar_cache import Period
+from backend.services.backtest import run_backtest
+from backend.services.screener import request_symbols
+
+router = APIRouter()
+
+
+class BacktestRequest(BaseModel):
+    # Either an explicit symbol list or the name of a universe file in UNIVERSE_DIR (e.g. "sample")
+    symbols: List[str] | None = None
+    universe: str | None = None
+    exchange: str = ""
+    period: Period = "10y"
+    # "short_term": /api/short-term-predict scoring, "signals": the RSI + news signal scoring
+    rules: Literal["short_term", "signals"] = "short_term"
+    horizon_days: int = Field(5, ge=1, le=60)
+
+
+@router.post("/api/backtest")
+def backtest(req: BacktestRequest):
+    try:
+        symbols = request_symbols(req.symbols, req.universe)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    if not symbols:
+        raise HTTPException(status_code=400, detail="Provide symbols or a universe.")
+
+    report, errors = run_backtest(symbols, req.exchange, period=req.period, rules=req.rules, horizon=req.horizon_days)
+    if report is None:
+        raise HTTPException(status_code=404, detail="No valid stock data found.")
+
+    report["errors"] = errors
+    return report
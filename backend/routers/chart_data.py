@@ -1,10 +1,72 @@
 from fastapi import APIRouter, Query
-from backend.services.indicators import calculate_rsi
+from backend.services.helpers.cache import TTLCache
+from backend.services.helpers.incremental_indicators import RSI, RollingSMA, indicator_from_dict
 from backend.services.data_service import apply_exchange_suffix, fetch_stock_data
-import pandas as pd
+import os
+import numpy as np
 
 router = APIRouter()
 
+CHART_INDICATORS = ("sma50", "sma200", "rsi")
+# Rows need a full window of the longest indicator inside the returned frame
+CHART_WARMUP_BARS = 200 - 1
+
+# 🧮 Indicator state per chart, checkpointed before the newest (possibly still forming) bar,
+# so a request only feeds the bars that arrived since the last one
+CHART_STATE_TTL = float(os.getenv("CHART_STATE_TTL", 24 * 3600))
+_chart_states = TTLCache(ttl=CHART_STATE_TTL, maxsize=2000)
+
+
+def _new_indicators():
+    # Simple-average RSI keeps the chart identical to the batch indicators
+    return {"sma50": RollingSMA(50), "sma200": RollingSMA(200), "rsi": RSI(14, smoothing="sma")}
+
+
+def _update(indicators, close):
+    return [indicators[name].update(close) for name in CHART_INDICATORS]
+
+
+def chart_indicator_values(key, df) -> dict:
+    """SMA50/SMA200/RSI for every bar of df, reusing the cached state for bars already seen."""
+    times = df.index.asi8
+    closes = df['Close'].to_numpy(dtype=float)
+    values = np.full((len(df), len(CHART_INDICATORS)), np.nan)
+
+    last = len(df) - 1
+    start, indicators = 0, None
+    state = _chart_states.get(key)
+    if state is not None:
+        cached_times = state["times"]
+        pos = int(np.searchsorted(times, cached_times[-1]))
+        # Resume only if the frame still lines up with the cached bars and the checkpoint
+        # is before the newest bar (a checkpoint at the newest bar would feed it twice)
+        if pos < last and times[pos] == cached_times[-1] and pos < len(cached_times) \
+                and cached_times[-(pos + 1)] == times[0]:
+            values[:pos + 1] = state["values"][-(pos + 1):]
+            indicators = {name: indicator_from_dict(state["indicators"][name]) for name in CHART_INDICATORS}
+            start = pos + 1
+
+    if indicators is None:
+        print(f"[DEBUG] Seeding chart indicators for {key}")
+        indicators = _new_indicators()
+
+    for i in range(start, last):
+        values[i] = _update(indicators, closes[i])
+
+    if last >= 1:
+        _chart_states.set(key, {
+            "times": times[:last].copy(),
+            "values": values[:last].copy(),
+            "indicators": {name: indicators[name].to_dict() for name in CHART_INDICATORS},
+        })
+
+    if last >= start:
+        values[last] = _update(indicators, closes[last])
+
+    values[:CHART_WARMUP_BARS] = np.nan
+    return {name: values[:, i] for i, name in enumerate(CHART_INDICATORS)}
+
+
 @router.get("/api/short-term-chart-data/{symbol}")
 def get_chart_data(symbol: str, exchange: str = Query("NASDAQ")):
     symbol_with_suffix = apply_exchange_suffix(symbol, exchange)
@@ -13,18 +75,16 @@ def get_chart_data(symbol: str, exchange: str = Query("NASDAQ")):
     if df is None or df.empty or 'Close' not in df.columns:
         return {"error": "No data available"}
 
-    df['SMA50'] = df['Close'].rolling(window=50).mean()
-    df['SMA200'] = df['Close'].rolling(window=200).mean()
-    df = calculate_rsi(df)
-    df = df.dropna(subset=["SMA50", "SMA200", "RSI"])
+    ind = chart_indicator_values((symbol_with_suffix, exchange), df)
+    valid = ~(np.isnan(ind["sma50"]) | np.isnan(ind["sma200"]) | np.isnan(ind["rsi"]))
 
     return {
-        "dates": df.index.strftime('%Y-%m-%d').tolist(),
-        "open": df['Open'].tolist(),
-        "high": df['High'].tolist(),
-        "low": df['Low'].tolist(),
-        "close": df['Close'].tolist(),
-        "sma50": df['SMA50'].tolist(),
-        "sma200": df['SMA200'].tolist(),
-        "rsi": df['RSI'].tolist()
+        "dates": df.index[valid].strftime('%Y-%m-%d').tolist(),
+        "open": df['Open'].to_numpy()[valid].tolist(),
+        "high": df['High'].to_numpy()[valid].tolist(),
+        "low": df['Low'].to_numpy()[valid].tolist(),
+        "close": df['Close'].to_numpy()[valid].tolist(),
+        "sma50": ind["sma50"][valid].tolist(),
+        "sma200": ind["sma200"][valid].tolist(),
+        "rsi": ind["rsi"][valid].tolist()
     }
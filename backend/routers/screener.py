@@ -0,0 +1,76 @@
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel, Field
+from typing import List
+import math
+from backend.services.bar_cache import Period
+from backend.services.screener import request_symbols, screen
+from backend.services.short_term_rules import CONFIDENCE_LABELS, DECISION_LABELS, TREND_LABELS
+
+router = APIRouter()
+
+MAX_PAGE_SIZE = 500
+
+
+class ScreenerRequest(BaseModel):
+    # Either an explicit symbol list or the name of a universe file in UNIVERSE_DIR (e.g. "sample")
+    symbols: List[str] | None = None
+    universe: str | None = None
+    exchange: str = ""
+    period: Period = "1mo"
+    risk_tolerance: float = 1.0
+    # Live news lookups are one request per symbol, so they are opt-in for large universes;
+    # otherwise the sentiment stored by background ingestion is used
+    include_sentiment: bool = False
+    min_score: int | None = None
+    page: int = Field(1, ge=1)
+    page_size: int = Field(50, ge=1, le=MAX_PAGE_SIZE)
+
+
+def safe_round(val, digits):
+    return round(float(val), digits) if val is not None and math.isfinite(val) else None
+
+
+@router.post("/api/screener")
+def screen_universe(req: ScreenerRequest):
+    try:
+        symbols = request_symbols(req.symbols, req.universe)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    if not symbols:
+        raise HTTPException(status_code=400, detail="Provide symbols or a universe.")
+
+    rows, errors = screen(symbols, req.exchange, period=req.period, risk_tolerance=req.risk_tolerance,
+                          include_sentiment=req.include_sentiment)
+    if req.min_score is not None:
+        rows = [row for row in rows if row["score"] >= req.min_score]
+
+    start = (req.page - 1) * req.page_size
+    results = [
+        {
+            "rank": start + i + 1,
+            "symbol": row["symbol"],
+            "current_price": safe_round(row["current_price"], 2),
+            "rsi": safe_round(row["rsi"], 2),
+            "volatility": safe_round(row["volatility"], 4),
+            "volume_spike": f"{row['volume_spike']:+.1f}% vs avg",
+            "stop_loss": safe_round(row["stop_loss"], 0),
+            "take_profit": safe_round(row["take_profit"], 0),
+            "news_sentiment": row["news_sentiment"],
+            "sentiment_score": row["sentiment_score"],
+            "trend": TREND_LABELS[row["trend"]],
+            "confidence": CONFIDENCE_LABELS[row["confidence"]],
+            "score": row["score"],
+            "final_decision": DECISION_LABELS[row["decision"]],
+        }
+        for i, row in enumerate(rows[start:start + req.page_size])
+    ]
+
+    return {
+        "universe": req.universe,
+        "screened": len(symbols),
+        "total": len(rows),
+        "page": req.page,
+        "page_size": req.page_size,
+        "results": results,
+        "errors": errors,
+    }
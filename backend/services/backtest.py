@@ -0,0 +1,160 @@
+# backend/services/backtest.py
+#
+# Replays the short-term decision rules over history, vectorized across time
+# and symbols: every indicator and rule is evaluated on time x symbols arrays
+# in one go, then each buy signal is held for a fixed number of bars.
+
+import numpy as np
+
+from backend.services.helpers.technical_indicators import compute_indicators, rolling_mean
+from backend.services.screener import (
+    RSI_WINDOW,
+    align_to_last_bar,
+    frames_to_arrays,
+    load_universe_frames,
+    mask_short_history,
+    restore_alignment,
+)
+from backend.services.short_term_rules import (
+    DECISION_LABELS,
+    INVEST,
+    INVEST_STRONGLY,
+    NEUTRAL_SENTIMENT_SCORE,
+    SIGNAL_DECISION_LABELS,
+    SIGNAL_FINAL_INVEST,
+    SIGNAL_INVEST_STRONGLY,
+    classify_trend,
+    news_signal_score,
+    score_signals,
+    score_technical_signals,
+    volume_spike,
+)
+
+# "short_term": /api/short-term-predict scoring, "signals": the RSI + news signal scoring
+RULES = {
+    "short_term": (DECISION_LABELS, (INVEST, INVEST_STRONGLY)),
+    "signals": (SIGNAL_DECISION_LABELS, (SIGNAL_FINAL_INVEST, SIGNAL_INVEST_STRONGLY)),
+}
+
+# The live endpoint compares the latest volume with the average over its 1mo window
+VOLUME_WINDOW = 21
+TRADING_DAYS = 252
+
+# Historical news isn't available, so replays use the neutral news decision throughout
+NEUTRAL_NEWS = "🟡 Neutral News - Hold"
+
+
+def _decisions(close, volume, rules: str) -> np.ndarray:
+    """Decision code per bar and symbol (-1 until every input of the rules is defined)."""
+    rsi = compute_indicators(close, indicators=("rsi",), rsi_window=RSI_WINDOW)["rsi"]
+    # Late-listed symbols are NaN-padded at the top; their first windows aren't real RSI
+    rsi = mask_short_history(rsi, close, RSI_WINDOW)
+    ready = ~np.isnan(rsi)
+
+    if rules == "signals":
+        _, _, decision = score_technical_signals(rsi, news_signal_score(NEUTRAL_NEWS))
+    else:
+        spike = volume_spike(volume, rolling_mean(volume, VOLUME_WINDOW))
+        trend = np.full(close.shape, -1)
+        trend[2:] = classify_trend(close[:-2], close[1:-1], close[2:])
+        ready &= ~np.isnan(spike) & (trend >= 0)
+        _, _, decision = score_signals(trend, rsi, spike, NEUTRAL_SENTIMENT_SCORE, False)
+
+    return np.where(ready, decision, -1)
+
+
+def _forward_returns(close, horizon: int) -> np.ndarray:
+    forward = np.full(close.shape, np.nan)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        forward[:-horizon] = close[horizon:] / close[:-horizon] - 1
+    return forward
+
+
+def _return_stats(returns: np.ndarray) -> dict:
+    returns = returns[~np.isnan(returns)]
+    if not len(returns):
+        return {"signals": 0, "hit_rate": None, "avg_return": None, "median_return": None}
+    return {
+        "signals": int(len(returns)),
+        "hit_rate": round(float((returns > 0).mean()) * 100, 2),
+        "avg_return": round(float(returns.mean()) * 100, 3),
+        "median_return": round(float(np.median(returns)) * 100, 3),
+    }
+
+
+def _holdings(signals: np.ndarray, horizon: int) -> np.ndarray:
+    """Positions open on each bar: signals from the previous `horizon` bars, one unit each."""
+    counts = np.cumsum(np.concatenate([np.zeros((1,) + signals.shape[1:]), signals]), axis=0)
+    # A signal at bar t is held over bars t+1 .. t+horizon
+    start = np.maximum(np.arange(len(signals)) - horizon, 0)
+    return counts[:-1] - counts[start]
+
+
+def _portfolio(daily_returns: np.ndarray, held: np.ndarray) -> dict:
+    weight = held.sum(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        strategy = np.where(weight > 0, np.nansum(held * daily_returns, axis=1) / weight, 0.0)
+
+    equity = np.cumprod(1 + strategy)
+    drawdown = equity / np.maximum.accumulate(equity) - 1
+    years = len(strategy) / TRADING_DAYS
+    total = float(equity[-1] - 1) if len(equity) else 0.0
+    return {
+        "total_return": round(total * 100, 2),
+        "annualized_return": round(((1 + total) ** (1 / years) - 1) * 100, 2) if years > 0 and total > -1 else None,
+        "max_drawdown": round(float(drawdown.min()) * 100, 2) if len(drawdown) else 0.0,
+        "exposure": round(float((weight > 0).mean()) * 100, 2) if len(weight) else 0.0,
+    }
+
+
+def backtest_arrays(close: np.ndarray, volume: np.ndarray, valid: np.ndarray, rules: str = "short_term",
+                    horizon: int = 5) -> dict:
+    """Backtest the rules on date-aligned time x symbols arrays (NaN where a symbol has no bar)."""
+    if rules not in RULES:
+        raise ValueError(f"Unknown rules: {rules}")
+    labels, buy_codes = RULES[rules]
+
+    # Everything runs on each symbol's own bars (so gaps don't break windows or stretch
+    # holding periods), then goes back onto the shared dates
+    aligned, order = align_to_last_bar({"Close": close, "Volume": volume}, valid)
+    close = aligned["Close"]
+    decision = _decisions(close, aligned["Volume"], rules)
+    held = _holdings(np.isin(decision, buy_codes), horizon)
+    daily = np.full(close.shape, np.nan)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        daily[1:] = close[1:] / close[:-1] - 1
+
+    decision = restore_alignment(decision, order)
+    forward = restore_alignment(_forward_returns(close, horizon), order)
+    daily = restore_alignment(daily, order)
+    held = restore_alignment(held, order)
+    buy = np.isin(decision, buy_codes)
+
+    by_decision = {label: _return_stats(forward[decision == code]) for code, label in enumerate(labels)}
+
+    return {
+        "buy_decisions": [labels[code] for code in buy_codes],
+        **_return_stats(forward[buy]),
+        "baseline": _return_stats(forward[decision >= 0]),
+        "by_decision": by_decision,
+        "portfolio": _portfolio(daily, held),
+    }
+
+
+def run_backtest(symbols: list[str], exchange: str = "", period: str = "10y", rules: str = "short_term",
+                 horizon: int = 5) -> tuple[dict | None, dict]:
+    """Backtest the rules over daily bars for a symbol list; returns (report, errors)."""
+    loaded, frames, errors = load_universe_frames(symbols, exchange, period=period, interval="1d")
+    if not loaded:
+        return None, errors
+
+    index, arrays, valid = frames_to_arrays(frames, loaded)
+    report = backtest_arrays(arrays["Close"], arrays["Volume"], valid, rules=rules, horizon=horizon)
+    report.update({
+        "rules": rules,
+        "horizon_days": horizon,
+        "symbols": len(loaded),
+        "start": str(index[0].date()),
+        "end": str(index[-1].date()),
+    })
+    return report, errors
@@ -0,0 +1,156 @@
+# backend/services/bar_cache.py
+#
+# On-disk OHLCV bar store. One pickle per (provider, resolved symbol, interval) holding the
+# bars we already downloaded, the earliest date they are guaranteed to cover and
+# when we last asked the provider for fresh bars.
+
+import os
+import pickle
+import re
+import threading
+import time
+from typing import Literal
+
+import pandas as pd
+
+BAR_CACHE_DIR = os.getenv(
+    "BAR_CACHE_DIR",
+    os.path.join(os.path.dirname(__file__), "..", "cache", "bars"),
+)
+
+# ⏱ How long cached bars are served without asking the provider for new ones
+REFRESH_SECONDS = {
+    "1m": 60,
+    "2m": 120,
+    "5m": 300,
+    "15m": 900,
+    "30m": 1800,
+    "60m": 3600,
+    "90m": 3600,
+    "1h": 3600,
+    "1d": 3600,
+    "5d": 6 * 3600,
+    "1wk": 6 * 3600,
+    "1mo": 6 * 3600,
+}
+
+_PERIOD_RE = re.compile(r"^(\d+)(d|wk|mo|y)$")
+
+# Named periods the API accepts from clients (yfinance's own list)
+Period = Literal["1d", "5d", "1mo", "3mo", "6mo", "1y", "2y", "5y", "10y", "ytd", "max"]
+
+
+def period_start(period: str, now: pd.Timestamp | None = None) -> pd.Timestamp | None:
+    """Earliest (naive UTC) timestamp a yfinance-style period covers, None for "max"."""
+    now = now or pd.Timestamp.now("UTC").tz_localize(None)
+    if period == "max":
+        return None
+    if period == "ytd":
+        return pd.Timestamp(year=now.year, month=1, day=1)
+
+    match = _PERIOD_RE.match(period)
+    if not match:
+        raise ValueError(f"Unsupported period: {period}")
+
+    count, unit = int(match.group(1)), match.group(2)
+    offsets = {
+        "d": pd.DateOffset(days=count),
+        "wk": pd.DateOffset(weeks=count),
+        "mo": pd.DateOffset(months=count),
+        "y": pd.DateOffset(years=count),
+    }
+    return (now - offsets[unit]).normalize()
+
+
+def slice_period(df: pd.DataFrame, start: pd.Timestamp | None) -> pd.DataFrame:
+    if start is None or df.empty:
+        return df
+    tz = getattr(df.index, "tz", None)
+    if tz is not None:
+        start = start.tz_localize("UTC").tz_convert(tz)
+    return df[df.index >= start]
+
+
+def slice_recent(df: pd.DataFrame, period: str) -> pd.DataFrame:
+    """The last `period` of bars, counted back from the newest bar rather than from now.
+
+    Cache hits and fresh downloads are cut the same way, and short periods like
+    "1d" still return the last session over weekends and holidays.
+    """
+    if df.empty:
+        return df
+    newest = df.index[-1]
+    if newest.tzinfo is not None:
+        newest = newest.tz_convert("UTC").tz_localize(None)
+    return slice_period(df, period_start(period, now=newest))
+
+
+class BarCache:
+    def __init__(self, root: str = BAR_CACHE_DIR):
+        self.root = os.path.abspath(root)
+        self._lock = threading.Lock()
+
+    def _path(self, symbol: str, interval: str) -> str:
+        safe_symbol = re.sub(r"[^A-Za-z0-9._-]", "_", symbol.upper())
+        return os.path.join(self.root, f"{safe_symbol}__{interval}.pkl")
+
+    def load(self, symbol: str, interval: str) -> dict | None:
+        path = self._path(symbol, interval)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, "rb") as fh:
+                return pickle.load(fh)
+        except Exception as e:
+            print(f"[WARN] Dropping unreadable bar cache {path}: {e}")
+            return None
+
+    def save(self, symbol: str, interval: str, bars: pd.DataFrame, covers_from: pd.Timestamp | None):
+        path = self._path(symbol, interval)
+        entry = {"bars": bars, "covers_from": covers_from, "fetched_at": time.time()}
+        with self._lock:
+            os.makedirs(self.root, exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as fh:
+                pickle.dump(entry, fh, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+
+    def touch(self, symbol: str, interval: str, entry: dict):
+        self.save(symbol, interval, entry["bars"], entry["covers_from"])
+
+    @staticmethod
+    def covers(entry: dict, start: pd.Timestamp | None) -> bool:
+        if entry["covers_from"] is None:
+            return True
+        return start is not None and entry["covers_from"] <= start
+
+    @staticmethod
+    def is_fresh(entry: dict, interval: str) -> bool:
+        return time.time() - entry["fetched_at"] < REFRESH_SECONDS.get(interval, 900)
+
+    @staticmethod
+    def merge(cached: pd.DataFrame, new_bars: pd.DataFrame) -> pd.DataFrame:
+        # Bulk downloads can come back in a different timezone than single-symbol ones
+        cached_tz = getattr(cached.index, "tz", None)
+        new_tz = getattr(new_bars.index, "tz", None)
+        if cached_tz is not None and new_tz is None:
+            new_bars = new_bars.tz_localize("UTC").tz_convert(cached_tz)
+        elif cached_tz is not None:
+            new_bars = new_bars.tz_convert(cached_tz)
+        elif new_tz is not None:
+            new_bars = new_bars.tz_convert("UTC").tz_localize(None)
+
+        # The last cached bar may have been partial, so newer rows win on overlap
+        merged = pd.concat([cached, new_bars])
+        merged = merged[~merged.index.duplicated(keep="last")]
+        return merged.sort_index()
+
+
+_caches: dict[str, BarCache] = {}
+
+
+def get_bar_cache(namespace: str) -> BarCache:
+    """One store per market-data provider so bars from different vendors never mix."""
+    if namespace not in _caches:
+        _caches[namespace] = BarCache(os.path.join(BAR_CACHE_DIR, namespace))
+    return _caches[namespace]
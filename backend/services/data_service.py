@@ -1,6 +1,11 @@
-import yfinance as yf
+import os
 import pandas as pd
 
+from backend.services.bar_cache import get_bar_cache, period_start, slice_recent
+from backend.services.market_data import get_provider
+from backend.services.singleflight import SingleFlight
+from backend.services.helpers.cache import TTLCache
+
 # 🌍 Exchange suffix mapping
 EXCHANGE_SUFFIX = {
     "LSE": ".L",
@@ -12,43 +17,192 @@ EXCHANGE_SUFFIX = {
     "Crypto": "-USD"
 }
 
+# 🛬 Concurrent identical history requests share one download
+_history_flights = SingleFlight()
+
+# 🧠 Interval that last worked per (symbol, exchange, period), and symbols known to have no data
+INTERVAL_MEMORY_TTL = float(os.getenv("INTERVAL_MEMORY_TTL", 6 * 3600))
+EMPTY_RESULT_TTL = float(os.getenv("EMPTY_RESULT_TTL", 15 * 60))
+_learned_intervals = TTLCache(ttl=INTERVAL_MEMORY_TTL, maxsize=10_000)
+_empty_results = TTLCache(ttl=EMPTY_RESULT_TTL, maxsize=10_000)
+
+INTERVAL_MINUTES = {
+    "1m": 1, "2m": 2, "5m": 5, "15m": 15, "30m": 30, "60m": 60, "90m": 90, "1h": 60,
+    "1d": 1440, "5d": 7200, "1wk": 10080, "1mo": 43200,
+}
+
 
 def apply_exchange_suffix(symbol: str, exchange: str) -> str:
-    return symbol + EXCHANGE_SUFFIX.get(exchange.upper(), "")
-
-def clean_yfinance_columns(df: pd.DataFrame, symbol_with_suffix: str) -> pd.DataFrame:
-    if isinstance(df.columns, pd.MultiIndex):
-        print(f"[DEBUG] Flattening MultiIndex columns for {symbol_with_suffix}")
-        df.columns = df.columns.get_level_values(1)
-
-    if all(col == symbol_with_suffix for col in df.columns):
-        print(f"[DEBUG] All columns are symbol for {symbol_with_suffix}, resetting headers.")
-        possible_headers = [
-            ['Open', 'High', 'Low', 'Close', 'Volume'],
-            ['Open', 'High', 'Low', 'Close', 'Adj Close', 'Volume']
-        ]
-        for headers in possible_headers:
-            if len(headers) == len(df.columns):
-                df.columns = headers
-                return df
-        raise ValueError(f"Header mismatch for symbol {symbol_with_suffix}")
-    return df
+    """Provider symbol for exchange; symbols that already carry the suffix are left alone."""
+    suffix = EXCHANGE_SUFFIX.get(exchange.upper(), "")
+    if suffix and not symbol.upper().endswith(suffix.upper()):
+        return symbol + suffix
+    return symbol
+
+def _download(symbol: str, interval: str, period: str | None = None, start: str | None = None) -> pd.DataFrame | None:
+    return get_provider().download(symbol, interval, period=period, start=start)
+
+
+def _bar_cache():
+    return get_bar_cache(get_provider().name)
+
+
+def get_history(symbol: str, period: str = "1y", interval: str = "1d") -> pd.DataFrame | None:
+    """OHLCV bars for an already-resolved symbol, served from the local bar cache when possible."""
+    df = _history_flights.do((symbol, period, interval), _load_history, symbol, period, interval)
+    # Every caller gets its own frame because routers add indicator columns in place
+    return None if df is None else df.copy()
+
+
+def _load_history(symbol: str, period: str, interval: str) -> pd.DataFrame | None:
+    try:
+        start = period_start(period, now=get_provider().now())
+    except ValueError as e:
+        print(f"[ERROR] {e} for {symbol}")
+        return None
+    bar_cache = _bar_cache()
+    entry = bar_cache.load(symbol, interval)
+
+    if entry is not None and bar_cache.covers(entry, start):
+        if bar_cache.is_fresh(entry, interval):
+            print(f"[CACHE] Hit for {symbol} ({interval})")
+            return slice_recent(entry["bars"], period)
+
+        last_ts = entry["bars"].index[-1]
+        try:
+            new_bars = _download(symbol, interval, start=last_ts.strftime("%Y-%m-%d"))
+            if new_bars is None:
+                print(f"[CACHE] No new bars for {symbol} ({interval}) since {last_ts}")
+                bar_cache.touch(symbol, interval, entry)
+                return slice_recent(entry["bars"], period)
+
+            bars = bar_cache.merge(entry["bars"], new_bars)
+            bar_cache.save(symbol, interval, bars, entry["covers_from"])
+            print(f"[CACHE] Topped up {symbol} ({interval}) with {len(new_bars)} bars")
+            return slice_recent(bars, period)
+        except Exception as e:
+            print(f"[WARN] Top-up failed for {symbol} ({interval}), refetching: {e}")
+
+    bars = _download(symbol, interval, period=period)
+    if bars is None:
+        return None
+    return slice_recent(_save_download(bar_cache, symbol, interval, bars, start, entry), period)
+
+
+def _save_download(bar_cache, symbol: str, interval: str, bars: pd.DataFrame, start, entry: dict | None) -> pd.DataFrame:
+    """Cache a period download without narrowing a longer history the existing entry already covers."""
+    if entry is not None and bar_cache.covers(entry, start):
+        bars = bar_cache.merge(entry["bars"], bars)
+        bar_cache.save(symbol, interval, bars, entry["covers_from"])
+    else:
+        bar_cache.save(symbol, interval, bars, start)
+    return bars
+
+
+def _bulk_download(symbols: list[str], interval: str, period: str | None = None, start: str | None = None) -> dict[str, pd.DataFrame]:
+    return get_provider().download_many(symbols, interval, period=period, start=start)
+
+
+def fetch_many(symbols: list[str], exchange: str = "", period: str = "1y", interval: str = "1d") -> tuple[dict[str, pd.DataFrame], dict[str, str]]:
+    """Bars for a whole symbol list with at most one bulk top-up and one bulk download.
+
+    Returns (frames, errors), both keyed by the symbols as passed in.
+    """
+    try:
+        start = period_start(period, now=get_provider().now())
+    except ValueError as e:
+        return {}, {symbol: str(e) for symbol in symbols}
+    resolved = {symbol: apply_exchange_suffix(symbol, exchange) for symbol in symbols}
+    bar_cache = _bar_cache()
+
+    bars, stale, missing = {}, {}, []
+    for smart_symbol in dict.fromkeys(resolved.values()):
+        entry = bar_cache.load(smart_symbol, interval)
+        if entry is not None and bar_cache.covers(entry, start):
+            if bar_cache.is_fresh(entry, interval):
+                bars[smart_symbol] = entry["bars"]
+            else:
+                stale[smart_symbol] = entry
+        else:
+            missing.append(smart_symbol)
+
+    if stale:
+        top_up_from = min(entry["bars"].index[-1] for entry in stale.values()).strftime("%Y-%m-%d")
+        try:
+            new_frames = _bulk_download(list(stale), interval, start=top_up_from)
+            for smart_symbol, entry in stale.items():
+                if smart_symbol in new_frames:
+                    merged = bar_cache.merge(entry["bars"], new_frames[smart_symbol])
+                    bar_cache.save(smart_symbol, interval, merged, entry["covers_from"])
+                    bars[smart_symbol] = merged
+                else:
+                    bar_cache.touch(smart_symbol, interval, entry)
+                    bars[smart_symbol] = entry["bars"]
+            print(f"[CACHE] Bulk top-up for {len(stale)} symbols ({interval}) from {top_up_from}")
+        except Exception as e:
+            print(f"[WARN] Bulk top-up failed, refetching {len(stale)} symbols: {e}")
+            missing.extend(stale)
+
+    errors = {}
+    if missing:
+        try:
+            new_frames = _bulk_download(missing, interval, period=period)
+            for smart_symbol, df in new_frames.items():
+                # Stale entries land here when their top-up failed; keep their longer history
+                bars[smart_symbol] = _save_download(bar_cache, smart_symbol, interval, df, start, stale.get(smart_symbol))
+            print(f"[SUCCESS] Bulk download for {len(new_frames)}/{len(missing)} symbols ({interval})")
+        except Exception as e:
+            print(f"[ERROR] Bulk download failed for {missing}: {e}")
+            # Stale symbols still have usable bars on disk; only symbols without any cache fail
+            for smart_symbol, entry in stale.items():
+                bars.setdefault(smart_symbol, entry["bars"])
+            errors.update({symbol: f"Download failed: {e}" for symbol, smart in resolved.items() if smart not in bars})
+
+    frames = {}
+    for symbol, smart_symbol in resolved.items():
+        if smart_symbol in bars:
+            frames[symbol] = slice_recent(bars[smart_symbol], period)
+        else:
+            errors.setdefault(symbol, "No data found")
+    return frames, errors
+
+
+def _fallback_intervals(interval: str, learned: str | None) -> list[str]:
+    intervals_to_try = list(dict.fromkeys([interval, "30m", "60m", "1d"]))
+    # Only jump ahead to a learned interval that is no finer than the one asked for,
+    # otherwise we would return higher-resolution data than the caller requested
+    if learned in intervals_to_try and INTERVAL_MINUTES.get(learned, 0) >= INTERVAL_MINUTES.get(interval, 0):
+        intervals_to_try.remove(learned)
+        intervals_to_try.insert(0, learned)
+    return intervals_to_try
+
 
 def fetch_stock_data(symbol: str, period="1d", exchange="LSE", interval="15m") -> pd.DataFrame | None:
     print(f"[DEBUG] Fetching: {symbol} with fallback intervals")
 
-    intervals_to_try = [interval, "30m", "60m", "1d"]
+    memory_key = (symbol, exchange, period)
+    if memory_key in _empty_results:
+        print(f"[WARN] Skipping {symbol}: no data on any interval recently")
+        return None
+
+    intervals_to_try = _fallback_intervals(interval, _learned_intervals.get(memory_key))
+    failed = False
     for intv in intervals_to_try:
         try:
-            df = yf.download(symbol, period=period, interval=intv, progress=False)
-            if not df.empty and "Close" in df.columns or isinstance(df.columns, pd.MultiIndex):
-                df = clean_yfinance_columns(df, symbol)  # <-- 💥 ADD THIS
+            df = get_history(symbol, period=period, interval=intv)
+            if df is not None and not df.empty and "Close" in df.columns:
                 df = df.dropna(subset=["Close"])
                 print(f"[SUCCESS] Found data for {symbol} with interval {intv}")
+                _learned_intervals.set(memory_key, intv)
                 return df
             else:
                 print(f"[WARN] No data for {symbol} at interval {intv}")
         except Exception as e:
             print(f"[ERROR] {symbol} failed on {intv}: {e}")
-    return None
+            failed = True
 
+    # Only remember symbols the provider answered with no data; errors (rate limits,
+    # network) are transient and the next request should try again
+    if not failed:
+        _empty_results.set(memory_key, True)
+    return None
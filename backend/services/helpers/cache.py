@@ -0,0 +1,70 @@
+# backend/services/helpers/cache.py
+
+import threading
+import time
+from collections import OrderedDict
+
+_MISSING = object()
+
+
+class TTLCache:
+    """Thread-safe LRU map whose entries optionally expire after `ttl` seconds.
+
+    `maxsize` bounds the number of entries, or their total weight when a `sizeof`
+    callable is given (e.g. bytes of a cached array).
+    """
+
+    def __init__(self, ttl: float | None = None, maxsize: int = 1024, sizeof=None):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.sizeof = sizeof or (lambda value: 1)
+        self._data: OrderedDict = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            item = self._data.get(key, _MISSING)
+            if item is _MISSING:
+                return default
+            value, expires_at, weight = item
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._data[key]
+                self._size -= weight
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl: float | None = None):
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        weight = self.sizeof(value)
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self._size -= old[2]
+            self._data[key] = (value, expires_at, weight)
+            self._size += weight
+            # Always keep the newest entry, even if it alone exceeds maxsize
+            while self._size > self.maxsize and len(self._data) > 1:
+                _, evicted = self._data.popitem(last=False)
+                self._size -= evicted[2]
+
+    def pop(self, key, default=None):
+        with self._lock:
+            item = self._data.pop(key, _MISSING)
+            if item is not _MISSING:
+                self._size -= item[2]
+        return default if item is _MISSING else item[0]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._size = 0
+
+    def __contains__(self, key) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
@@ -0,0 +1,317 @@
+# backend/services/helpers/incremental_indicators.py
+#
+# Stateful indicators that take one bar at a time in O(1). Each one can be
+# seeded from history, updated as new bars arrive, and round-tripped through
+# to_dict() / indicator_from_dict() (plain JSON-friendly values) so its state
+# can be cached between requests. With default arguments RollingSMA, RollingStd
+# and ATR give the same values as technical_indicators.compute_indicators;
+# RSI defaults to Wilder smoothing, RSI(smoothing="sma") matches the batch RSI.
+
+import math
+from collections import deque
+
+NAN = float("nan")
+
+# Running sums are rebuilt from the window this often so float drift can't build up
+RESUM_EVERY = 1000
+
+SMOOTHINGS = ("wilder", "sma")
+
+
+def _fmax(a: float, b: float) -> float:
+    """max() that ignores a NaN operand, like np.fmax."""
+    if math.isnan(a):
+        return b
+    if math.isnan(b):
+        return a
+    return a if a >= b else b
+
+
+class RollingWindow:
+    """Last `window` values with their running sum and sum of squares."""
+
+    def __init__(self, window: int):
+        if window < 1:
+            raise ValueError("window must be at least 1")
+        self.window = window
+        self.values = deque(maxlen=window)
+        self.total = 0.0
+        self.total_sq = 0.0
+        self.missing = 0
+        self.updates = 0
+
+    def push(self, value: float):
+        if len(self.values) == self.window:
+            old = self.values[0]
+            if math.isnan(old):
+                self.missing -= 1
+            else:
+                self.total -= old
+                self.total_sq -= old * old
+
+        self.values.append(value)
+        if math.isnan(value):
+            self.missing += 1
+        else:
+            self.total += value
+            self.total_sq += value * value
+
+        self.updates += 1
+        if self.updates % RESUM_EVERY == 0:
+            self._resum()
+
+    def _resum(self):
+        finite = [v for v in self.values if not math.isnan(v)]
+        self.total = math.fsum(finite)
+        self.total_sq = math.fsum(v * v for v in finite)
+        self.missing = len(self.values) - len(finite)
+
+    @property
+    def ready(self) -> bool:
+        """Full window without NaNs (pandas' default min_periods)."""
+        return len(self.values) == self.window and self.missing == 0
+
+    def mean(self) -> float:
+        return self.total / self.window if self.ready else NAN
+
+    def std(self, ddof: int = 1) -> float:
+        if not self.ready or self.window <= ddof:
+            return NAN
+        var = (self.total_sq - self.total * self.total / self.window) / (self.window - ddof)
+        return math.sqrt(max(var, 0.0))
+
+    def to_dict(self) -> dict:
+        return {"window": self.window, "values": list(self.values)}
+
+    @classmethod
+    def from_dict(cls, state: dict) -> "RollingWindow":
+        window = cls(state["window"])
+        window.values.extend(float(v) for v in state["values"])
+        window._resum()
+        return window
+
+
+class WilderAverage:
+    """Wilder's smoothing: a plain mean of the first `window` values, then avg += (x - avg) / window."""
+
+    def __init__(self, window: int):
+        if window < 1:
+            raise ValueError("window must be at least 1")
+        self.window = window
+        self.count = 0
+        self.total = 0.0
+        self.average = NAN
+
+    def push(self, value: float):
+        if self.count < self.window:
+            self.total += value
+            self.count += 1
+            if self.count == self.window:
+                self.average = self.total / self.window
+        else:
+            self.average = (self.average * (self.window - 1) + value) / self.window
+
+    @property
+    def ready(self) -> bool:
+        return self.count >= self.window
+
+    def mean(self) -> float:
+        return self.average
+
+    def to_dict(self) -> dict:
+        return {"window": self.window, "count": self.count, "total": self.total, "average": self.average}
+
+    @classmethod
+    def from_dict(cls, state: dict) -> "WilderAverage":
+        average = cls(state["window"])
+        average.count = state["count"]
+        average.total = state["total"]
+        average.average = state["average"]
+        return average
+
+
+def _average(window: int, smoothing: str):
+    if smoothing not in SMOOTHINGS:
+        raise ValueError(f"Unknown smoothing: {smoothing}")
+    return WilderAverage(window) if smoothing == "wilder" else RollingWindow(window)
+
+
+def _average_from_dict(state: dict, smoothing: str):
+    return WilderAverage.from_dict(state) if smoothing == "wilder" else RollingWindow.from_dict(state)
+
+
+class RollingSMA:
+    """Simple moving average of closes."""
+
+    def __init__(self, window: int = 50):
+        self._window = RollingWindow(window)
+        self.value = NAN
+
+    def update(self, close: float) -> float:
+        self._window.push(float(close))
+        self.value = self._window.mean()
+        return self.value
+
+    def seed(self, closes) -> float:
+        for close in closes:
+            self.update(close)
+        return self.value
+
+    def to_dict(self) -> dict:
+        return {"type": "sma", "state": self._window.to_dict(), "value": self.value}
+
+    @classmethod
+    def from_dict(cls, state: dict) -> "RollingSMA":
+        indicator = cls(state["state"]["window"])
+        indicator._window = RollingWindow.from_dict(state["state"])
+        indicator.value = state["value"]
+        return indicator
+
+
+class RollingStd:
+    """Rolling sample standard deviation (ddof=1) of whatever series is fed in, e.g. returns."""
+
+    def __init__(self, window: int = 14, ddof: int = 1):
+        self._window = RollingWindow(window)
+        self.ddof = ddof
+        self.value = NAN
+
+    def update(self, value: float) -> float:
+        self._window.push(float(value))
+        self.value = self._window.std(self.ddof)
+        return self.value
+
+    def seed(self, values) -> float:
+        for value in values:
+            self.update(value)
+        return self.value
+
+    def to_dict(self) -> dict:
+        return {"type": "std", "state": self._window.to_dict(), "ddof": self.ddof, "value": self.value}
+
+    @classmethod
+    def from_dict(cls, state: dict) -> "RollingStd":
+        indicator = cls(state["state"]["window"], ddof=state["ddof"])
+        indicator._window = RollingWindow.from_dict(state["state"])
+        indicator.value = state["value"]
+        return indicator
+
+
+class RSI:
+    """Relative strength index from closes.
+
+    "wilder" seeds the average gain/loss with the first `window` moves and then
+    smooths them; "sma" uses rolling means, counting the first bar as a zero
+    move like the batch RSI does. Moves touching a missing close count as zero.
+    """
+
+    def __init__(self, window: int = 14, smoothing: str = "wilder"):
+        self.window = window
+        self.smoothing = smoothing
+        self._gains = _average(window, smoothing)
+        self._losses = _average(window, smoothing)
+        self.prev_close = None
+        self.value = NAN
+
+    def update(self, close: float) -> float:
+        close = float(close)
+        if self.prev_close is None:
+            delta = 0.0 if self.smoothing == "sma" else None
+        else:
+            delta = close - self.prev_close
+        self.prev_close = close
+
+        if delta is None:
+            return self.value
+
+        self._gains.push(delta if delta > 0 else 0.0)
+        self._losses.push(-delta if delta < 0 else 0.0)
+
+        if not (self._gains.ready and self._losses.ready):
+            self.value = NAN
+            return self.value
+
+        gain, loss = self._gains.mean(), self._losses.mean()
+        if loss == 0:
+            self.value = 100.0 if gain > 0 else NAN
+        else:
+            self.value = 100 - (100 / (1 + gain / loss))
+        return self.value
+
+    def seed(self, closes) -> float:
+        for close in closes:
+            self.update(close)
+        return self.value
+
+    def to_dict(self) -> dict:
+        return {
+            "type": "rsi", "window": self.window, "smoothing": self.smoothing,
+            "gains": self._gains.to_dict(), "losses": self._losses.to_dict(),
+            "prev_close": self.prev_close, "value": self.value,
+        }
+
+    @classmethod
+    def from_dict(cls, state: dict) -> "RSI":
+        indicator = cls(state["window"], smoothing=state["smoothing"])
+        indicator._gains = _average_from_dict(state["gains"], indicator.smoothing)
+        indicator._losses = _average_from_dict(state["losses"], indicator.smoothing)
+        indicator.prev_close = state["prev_close"]
+        indicator.value = state["value"]
+        return indicator
+
+
+class ATR:
+    """Average true range; "sma" (default) matches the batch ATR, "wilder" is the classic smoothing."""
+
+    def __init__(self, window: int = 14, smoothing: str = "sma"):
+        self.window = window
+        self.smoothing = smoothing
+        self._ranges = _average(window, smoothing)
+        self.prev_close = None
+        self.value = NAN
+
+    def update(self, high: float, low: float, close: float) -> float:
+        high, low, close = float(high), float(low), float(close)
+        true_range = high - low
+        if self.prev_close is not None:
+            true_range = _fmax(true_range, abs(high - self.prev_close))
+            true_range = _fmax(true_range, abs(low - self.prev_close))
+        self.prev_close = close
+
+        self._ranges.push(true_range)
+        self.value = self._ranges.mean() if self._ranges.ready else NAN
+        return self.value
+
+    def seed(self, highs, lows, closes) -> float:
+        for high, low, close in zip(highs, lows, closes):
+            self.update(high, low, close)
+        return self.value
+
+    def to_dict(self) -> dict:
+        return {
+            "type": "atr", "window": self.window, "smoothing": self.smoothing,
+            "ranges": self._ranges.to_dict(), "prev_close": self.prev_close, "value": self.value,
+        }
+
+    @classmethod
+    def from_dict(cls, state: dict) -> "ATR":
+        indicator = cls(state["window"], smoothing=state["smoothing"])
+        indicator._ranges = _average_from_dict(state["ranges"], indicator.smoothing)
+        indicator.prev_close = state["prev_close"]
+        indicator.value = state["value"]
+        return indicator
+
+
+INDICATOR_TYPES = {
+    "sma": RollingSMA,
+    "std": RollingStd,
+    "rsi": RSI,
+    "atr": ATR,
+}
+
+
+def indicator_from_dict(state: dict):
+    """Rebuild any indicator from its to_dict() output."""
+    if state.get("type") not in INDICATOR_TYPES:
+        raise ValueError(f"Unknown indicator state: {state.get('type')}")
+    return INDICATOR_TYPES[state["type"]].from_dict(state)
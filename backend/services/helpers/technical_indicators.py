@@ -3,33 +3,138 @@
 import pandas as pd
 import numpy as np
 
-def calculate_rsi(data, window=14):
-    delta = data['Close'].diff()
-    gain = delta.where(delta > 0, 0.0)
-    loss = -delta.where(delta < 0, 0.0)
+# Indicators compute_indicators knows how to produce
+INDICATORS = ("sma50", "sma200", "rsi", "atr", "volatility", "log_volatility")
 
-    avg_gain = gain.rolling(window=window, min_periods=window).mean()
-    avg_loss = loss.rolling(window=window, min_periods=window).mean()
 
-    rs = avg_gain / avg_loss
-    rsi = 100 - (100 / (1 + rs))
+def _window_sums(values: np.ndarray, window: int):
+    """Rolling sums over axis 0 plus a mask of windows that contain a NaN."""
+    missing = np.isnan(values)
+    filled = np.where(missing, 0.0, values)
+
+    pad = np.zeros((1,) + values.shape[1:])
+    sums = np.cumsum(np.concatenate([pad, filled]), axis=0)
+    sums = sums[window:] - sums[:-window]
+    counts = np.cumsum(np.concatenate([pad, missing]), axis=0)
+    has_nan = (counts[window:] - counts[:-window]) > 0
+    return sums, has_nan
+
+
+def rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+    """pandas' .rolling(window).mean() along axis 0 (NaN until the window is full)."""
+    out = np.full(values.shape, np.nan)
+    if len(values) < window:
+        return out
+    sums, has_nan = _window_sums(values, window)
+    out[window - 1:] = np.where(has_nan, np.nan, sums / window)
+    return out
+
+
+def rolling_std(values: np.ndarray, window: int, ddof: int = 1) -> np.ndarray:
+    """pandas' .rolling(window).std() along axis 0."""
+    out = np.full(values.shape, np.nan)
+    if len(values) < window:
+        return out
+    sums, has_nan = _window_sums(values, window)
+    squares, _ = _window_sums(values * values, window)
+    var = (squares - sums * sums / window) / (window - ddof)
+    out[window - 1:] = np.where(has_nan, np.nan, np.sqrt(np.clip(var, 0.0, None)))
+    return out
+
+
+def _shifted_ratio(close: np.ndarray) -> np.ndarray:
+    ratio = np.full(close.shape, np.nan)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio[1:] = close[1:] / close[:-1]
+    return ratio
+
+
+def _rsi(close: np.ndarray, window: int) -> np.ndarray:
+    delta = np.zeros(close.shape)
+    delta[1:] = np.diff(close, axis=0)
+    # Same as pandas' delta.where(delta > 0, 0.0): NaN moves count as no move
+    gain = np.where(delta > 0, delta, 0.0)
+    loss = np.where(delta < 0, -delta, 0.0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rs = rolling_mean(gain, window) / rolling_mean(loss, window)
+        return 100 - (100 / (1 + rs))
+
+
+def _true_range(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+    true_range = high - low
+    prev_close = close[:-1]
+    # Row max of (H-L, |H-Cprev|, |L-Cprev|); the first bar has no previous close
+    np.fmax(true_range[1:], np.abs(high[1:] - prev_close), out=true_range[1:])
+    np.fmax(true_range[1:], np.abs(low[1:] - prev_close), out=true_range[1:])
+    return true_range
 
-    data['RSI'] = rsi
-    return data
 
+def compute_indicators(close, high=None, low=None, indicators=INDICATORS, rsi_window=14, atr_window=14,
+                       volatility_window=14) -> dict:
+    """Compute the requested indicators in one pass over contiguous float arrays.
+
+    Arrays may be 1D (one symbol) or 2D (time x symbols); every indicator runs along axis 0
+    and matches the pandas rolling implementations it replaces:
+      sma50 / sma200   rolling mean of close
+      rsi              simple-average RSI (rolling mean of gains / losses)
+      atr              rolling mean of true range (needs high and low)
+      volatility       rolling std of pct_change
+      log_volatility   rolling std of log returns, annualised with sqrt(252)
+    """
+    unknown = set(indicators) - set(INDICATORS)
+    if unknown:
+        raise ValueError(f"Unknown indicators: {sorted(unknown)}")
+
+    close = np.ascontiguousarray(close, dtype=float)
+    out = {}
+
+    if "sma50" in indicators:
+        out["sma50"] = rolling_mean(close, 50)
+    if "sma200" in indicators:
+        out["sma200"] = rolling_mean(close, 200)
+    if "rsi" in indicators:
+        out["rsi"] = _rsi(close, rsi_window)
+    if "atr" in indicators:
+        if high is None or low is None:
+            raise ValueError("ATR needs high and low prices")
+        high = np.ascontiguousarray(high, dtype=float)
+        low = np.ascontiguousarray(low, dtype=float)
+        out["atr"] = rolling_mean(_true_range(high, low, close), atr_window)
+
+    if "volatility" in indicators or "log_volatility" in indicators:
+        ratio = _shifted_ratio(close)
+        if "volatility" in indicators:
+            out["volatility"] = rolling_std(ratio - 1, volatility_window)
+        if "log_volatility" in indicators:
+            with np.errstate(divide="ignore", invalid="ignore"):
+                out["log_volatility"] = rolling_std(np.log(ratio), volatility_window) * np.sqrt(252)
+
+    return out
+
+
+def compute_frame_indicators(df: pd.DataFrame, indicators=INDICATORS, **kwargs) -> dict:
+    """compute_indicators for an OHLC frame; only the columns the indicators need are read."""
+    needs_range = "atr" in indicators
+    return compute_indicators(
+        df['Close'].to_numpy(dtype=float),
+        high=df['High'].to_numpy(dtype=float) if needs_range else None,
+        low=df['Low'].to_numpy(dtype=float) if needs_range else None,
+        indicators=indicators,
+        **kwargs,
+    )
+
+
+def last_valid(values: np.ndarray):
+    """Last non-NaN value of a 1D array, or None."""
+    valid = values[~np.isnan(values)]
+    return valid[-1] if len(valid) else None
+
+
+def calculate_rsi(data, window=14):
+    data['RSI'] = compute_frame_indicators(data, ("rsi",), rsi_window=window)["rsi"]
+    return data
 
 
 def calculate_atr(data, window=14):
-    high_low = data['High'] - data['Low']
-    high_close = np.abs(data['High'] - data['Close'].shift())
-    low_close = np.abs(data['Low'] - data['Close'].shift())
-
-    true_range = pd.DataFrame({
-        'HL': high_low,
-        'HC': high_close,
-        'LC': low_close
-    }).max(axis=1)
-
-    atr = true_range.rolling(window=window).mean()
-    data['ATR'] = atr
+    data['ATR'] = compute_frame_indicators(data, ("atr",), atr_window=window)["atr"]
     return data
@@ -1,31 +1,51 @@
-import matplotlib.pyplot as plt
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
 import io
 import base64
+import os
 import numpy as np
 import pandas as pd
-import yfinance as yf
-from tensorflow.keras.models import Sequential
-from tensorflow.keras.layers import Dense, LSTM, Dropout
-from tensorflow.keras.callbacks import EarlyStopping
-from sklearn.preprocessing import MinMaxScaler
+from concurrent.futures.process import BrokenProcessPool
+from numpy.lib.stride_tricks import sliding_window_view
+from backend.services.data_service import get_history
+from backend.services.helpers.cache import TTLCache
+from backend.services.lstm_numpy import MinMaxScaling, NumpyLSTM
+from backend.services.model_registry import get_model_registry
+from backend.services.singleflight import SingleFlight
+from backend.services.worker_pool import TRAINING_WORKERS, get_pool, reset_pool
+
+# 🧠 Trained models already loaded in this process, keyed by registry entry.
+# Inference runs on exported arrays with NumPy; TensorFlow is only imported by
+# the "training" pool workers (services/lstm_training.py).
+LSTM_MODEL_CACHE_SIZE = int(os.getenv("LSTM_MODEL_CACHE_SIZE", 16))
+_loaded_models = TTLCache(maxsize=LSTM_MODEL_CACHE_SIZE)
+# Concurrent requests for the same model share one training run
+_training_flights = SingleFlight()
 
 def prepare_lstm_data(df, look_back=60):
+    from sklearn.preprocessing import MinMaxScaler
+
     df_close = df['Close'].values.reshape(-1, 1)
     scaler = MinMaxScaler()
     scaled_data = scaler.fit_transform(df_close)
 
-    x_train, y_train = [], []
-    for i in range(look_back, len(scaled_data)):
-        x_train.append(scaled_data[i-look_back:i, 0])
-        y_train.append(scaled_data[i, 0])
-
-    x_train = np.array(x_train)
-    y_train = np.array(y_train)
-    x_train = np.reshape(x_train, (x_train.shape[0], x_train.shape[1], 1))
+    x_train, y_train = lstm_windows(scaled_data, look_back)
 
     return x_train, y_train, scaler, df_close
 
 
+def lstm_windows(scaled_data, lookback: int):
+    """(X, y) training pairs as read-only strided views: X[i] is the lookback window before y[i].
+
+    X has shape (samples, lookback, 1) but shares memory with the series, so
+    no per-window copies are made however long the history is.
+    """
+    series = np.ascontiguousarray(scaled_data, dtype=np.float32).reshape(-1)
+    X = sliding_window_view(series[:-1], lookback)[..., np.newaxis]
+    y = series[lookback:]
+    return X, y
+
+
 def summarize_predictions(predicted_prices):
     start_price = predicted_prices[0]
     end_price = predicted_prices[-1]
@@ -52,65 +72,92 @@ def summarize_predictions(predicted_prices):
     return summary
 
 
-def predict_lstm(symbol: str, period: str = "2y", lookback: int = 60, future_days: int = 30):
-        print(f"🛠 predict_lstm: Running prediction for {symbol}")
-        df = yf.download(symbol, period=period)
+def _runtime(arrays: dict, meta: dict):
+    return NumpyLSTM.from_arrays(arrays), MinMaxScaling.from_arrays(arrays), meta
 
-        if df.empty:
-            print(f"❌ No data found for {symbol}")
-            return None, "No data found."
 
-        data = df[['Close']].dropna()
+def _load_saved_model(symbol: str, period: str, lookback: int, meta: dict):
+    key = (symbol, period, lookback, meta["saved_at"])
+    cached = _loaded_models.get(key)
+    if cached is not None:
+        return cached
 
-        if data.empty or len(data) < lookback:
-            print(f"❌ Not enough data for {symbol}. Found {len(data)} rows, need at least {lookback}.")
-            return None, "Not enough data to train the model."
+    loaded = _runtime(get_model_registry().load_arrays(symbol, period, lookback), meta)
+    _loaded_models.set(key, loaded)
+    return loaded
 
-        # Proceed safely after validation
-        scaler = MinMaxScaler(feature_range=(0, 1))
-        scaled_data = scaler.fit_transform(data)
 
-        X, y = [], []
-        for i in range(lookback, len(scaled_data)):
-            X.append(scaled_data[i - lookback:i, 0])
-            y.append(scaled_data[i, 0])
-        X, y = np.array(X), np.array(y)
-        X = np.reshape(X, (X.shape[0], X.shape[1], 1))
+def _train_in_worker(symbol: str, period: str, lookback: int, closes: np.ndarray, last_bar: str):
+    # Runs in a "training" pool process; the import keeps TensorFlow out of the API process
+    from backend.services.lstm_training import train_and_save
+
+    return train_and_save(symbol, period, lookback, closes, last_bar)
 
-        if len(X) < 1:
-            return None, "Not enough data to train the model."
 
-        model = Sequential([
-            LSTM(units=50, return_sequences=True, input_shape=(X.shape[1], 1)),
-            Dropout(0.2),
-            LSTM(units=50),
-            Dropout(0.2),
-            Dense(units=1)
-        ])
+def _train(symbol: str, period: str, lookback: int, data: pd.DataFrame):
+    args = (symbol, period, lookback, data['Close'].to_numpy(dtype=np.float64), str(data.index[-1]))
+    try:
+        future = get_pool("training", TRAINING_WORKERS).submit(_train_in_worker, *args)
+    except BrokenProcessPool:
+        print("[ERROR] 'training' process pool died, restarting it")
+        reset_pool("training")
+        future = get_pool("training", TRAINING_WORKERS).submit(_train_in_worker, *args)
+    return future.result()
 
-        model.compile(optimizer='adam', loss='mean_squared_error')
 
-        early_stop = EarlyStopping(monitor='loss', patience=3, restore_best_weights=True)
+def _load_or_train(symbol: str, period: str, lookback: int, data: pd.DataFrame):
+    registry = get_model_registry()
+    meta = registry.load_meta(symbol, period, lookback)
+    reason = registry.staleness(meta, data.index)
 
-        model.fit(X, y, epochs=10, batch_size=32, verbose=0, callbacks=[early_stop])
+    if reason is None:
+        try:
+            loaded = _load_saved_model(symbol, period, lookback, meta)
+            print(f"[CACHE] Reusing LSTM model for {symbol} trained on bars up to {meta['last_bar']}")
+            return loaded
+        except Exception as e:
+            print(f"[WARN] Could not load saved LSTM model for {symbol}: {e}")
+            reason = "unreadable saved model"
 
-        input_seq = scaled_data[-lookback:, 0].reshape(1, lookback, 1)
+    print(f"🧠 Training LSTM for {symbol} ({reason})")
+    arrays, meta = _train(symbol, period, lookback, data)
+    loaded = _runtime(arrays, meta)
+    _loaded_models.set((symbol, period, lookback, meta["saved_at"]), loaded)
+    return loaded
 
 
-        predictions = []
-        for _ in range(future_days):
-            pred = model.predict(input_seq, verbose=0)
-            predictions.append(pred[0][0])
-            input_seq = np.concatenate([input_seq[:, 1:, :], np.expand_dims(pred, axis=1)], axis=1)
+def load_or_train_model(symbol: str, period: str, lookback: int, data: pd.DataFrame):
+    """(NumpyLSTM, scaling, meta) for symbol: the saved model while it is fresh, otherwise one trained on the pool."""
+    return _training_flights.do((symbol, period, lookback), _load_or_train, symbol, period, lookback, data)
+
+
+def predict_lstm(symbol: str, period: str = "2y", lookback: int = 60, future_days: int = 30):
+        print(f"🛠 predict_lstm: Running prediction for {symbol}")
+        df = get_history(symbol, period=period, interval="1d")
+
+        if df is None or df.empty:
+            print(f"❌ No data found for {symbol}")
+            return None, "No data found."
+
+        data = df[['Close']].dropna()
+
+        if data.empty or len(data) <= lookback:
+            print(f"❌ Not enough data for {symbol}. Found {len(data)} rows, need more than {lookback}.")
+            return None, "Not enough data to train the model."
+
+        # Saved model while it is fresh, otherwise train (and save) a new one
+        model, scaler, meta = load_or_train_model(symbol, period, lookback, data)
+        input_seq = scaler.transform(data['Close'].to_numpy()[-lookback:])
 
-        predicted_prices = scaler.inverse_transform(np.array(predictions).reshape(-1, 1)).flatten().tolist()
+        predictions = model.forecast(input_seq, future_days)
+        predicted_prices = scaler.inverse_transform(predictions).tolist()
 
         upper_bounds = [round(p * 1.01, 2) for p in predicted_prices]
         lower_bounds = [round(p * 0.99, 2) for p in predicted_prices]
 
         summary = summarize_predictions(predicted_prices)
-        loss = model.evaluate(X, y, verbose=0)
-        confidence = round(100 - loss * 100, 2)
+        # Training loss is stored with the model, so warm requests skip re-evaluating it
+        confidence = round(100 - meta["loss"] * 100, 2)
 
         chart_base64 = generate_chart(symbol, predicted_prices, upper_bounds, lower_bounds)
         current_price = round(df['Close'].iloc[-1], 2)  # fetch last close price
@@ -118,24 +165,26 @@ def predict_lstm(symbol: str, period: str = "2y", lookback: int = 60, future_day
 
 
 def generate_chart(symbol, predicted_prices, upper_bounds=None, lower_bounds=None):
-    plt.figure(figsize=(10, 5))
-    plt.plot(predicted_prices, label="Predicted", color='blue')
+    # A standalone Figure rather than pyplot's global state: predictions render on several threads at once
+    fig = Figure(figsize=(10, 5))
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    ax.plot(predicted_prices, label="Predicted", color='blue')
 
     if upper_bounds and lower_bounds:
-        plt.fill_between(range(len(predicted_prices)), lower_bounds, upper_bounds, color='lightblue', alpha=0.3, label='Confidence Band')
+        ax.fill_between(range(len(predicted_prices)), lower_bounds, upper_bounds, color='lightblue', alpha=0.3, label='Confidence Band')
 
-    plt.title(f"{symbol} Medium-Term LSTM Price Prediction")
-    plt.xlabel("Days Ahead")
-    plt.ylabel("Price")
-    plt.legend()
-    plt.grid(True)
-    plt.tight_layout()
+    ax.set_title(f"{symbol} Medium-Term LSTM Price Prediction")
+    ax.set_xlabel("Days Ahead")
+    ax.set_ylabel("Price")
+    ax.legend()
+    ax.grid(True)
+    fig.tight_layout()
 
     buffer = io.BytesIO()
-    plt.savefig(buffer, format='png')
+    fig.savefig(buffer, format='png')
     buffer.seek(0)
     chart_base64 = base64.b64encode(buffer.getvalue()).decode('utf-8')
     buffer.close()
-    plt.close()
 
     return chart_base64
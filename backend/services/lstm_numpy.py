@@ -0,0 +1,97 @@
+# backend/services/lstm_numpy.py
+#
+# Inference for the medium-term LSTM with NumPy only. Training exports the
+# Keras weights to plain arrays (see lstm_training.export_arrays); API workers
+# load those and run the forward pass here, so they never import TensorFlow.
+
+import numpy as np
+
+
+def _sigmoid(x):
+    out = np.negative(x)
+    np.exp(out, out=out)
+    out += 1.0
+    return np.reciprocal(out, out=out)
+
+
+def lstm_layer(inputs, kernel, recurrent_kernel, bias):
+    """Run one Keras LSTM layer over inputs (batch, steps, features); returns every step's output.
+
+    Gates are packed in Keras order (input, forget, cell, output) along the last
+    axis of kernel (features, 4*units), recurrent_kernel (units, 4*units) and bias.
+    """
+    batch, steps, _ = inputs.shape
+    units = recurrent_kernel.shape[0]
+    # Input contribution for all steps in one matmul; only the recurrence is sequential
+    projected = inputs @ kernel + bias
+    h = np.zeros((batch, units), dtype=inputs.dtype)
+    c = np.zeros((batch, units), dtype=inputs.dtype)
+    outputs = np.empty((batch, steps, units), dtype=inputs.dtype)
+    for t in range(steps):
+        z = projected[:, t] + h @ recurrent_kernel
+        # One sigmoid over all four gates (the cell slice is unused) is cheaper than three small calls
+        gates = _sigmoid(z)
+        c = gates[:, units:2 * units] * c + gates[:, :units] * np.tanh(z[:, 2 * units:3 * units])
+        h = gates[:, 3 * units:] * np.tanh(c)
+        outputs[:, t] = h
+    return outputs
+
+
+class NumpyLSTM:
+    """Stacked LSTM layers and a Dense(1) head, as exported by lstm_training.export_arrays.
+
+    Dropout layers are no-ops at inference and have no weights, so they are not part of the export.
+    """
+
+    def __init__(self, layers: list[tuple], dense: tuple, dtype=np.float32):
+        self.dtype = dtype
+        self.layers = [tuple(np.asarray(w, dtype=dtype) for w in layer) for layer in layers]
+        self.dense_kernel, self.dense_bias = (np.asarray(w, dtype=dtype) for w in dense)
+
+    @classmethod
+    def from_arrays(cls, arrays) -> "NumpyLSTM":
+        layers = []
+        while f"lstm{len(layers)}_kernel" in arrays:
+            prefix = f"lstm{len(layers)}"
+            layers.append((arrays[f"{prefix}_kernel"], arrays[f"{prefix}_recurrent_kernel"], arrays[f"{prefix}_bias"]))
+        if not layers:
+            raise ValueError("No LSTM layers in exported weights")
+        return cls(layers, (arrays["dense_kernel"], arrays["dense_bias"]))
+
+    def predict(self, windows) -> np.ndarray:
+        """Next scaled value for each (lookback, 1) window in windows (batch, lookback, 1)."""
+        x = np.asarray(windows, dtype=self.dtype)
+        for kernel, recurrent_kernel, bias in self.layers:
+            x = lstm_layer(x, kernel, recurrent_kernel, bias)
+        # Only the last layer's final step feeds the Dense head (return_sequences=False)
+        return (x[:, -1] @ self.dense_kernel + self.dense_bias)[:, 0]
+
+    def forecast(self, window, steps: int) -> np.ndarray:
+        """Scaled predictions for the next `steps` values, each one appended to the window for the next."""
+        window = np.asarray(window, dtype=self.dtype).reshape(1, -1, 1).copy()
+        predictions = np.empty(steps, dtype=self.dtype)
+        for i in range(steps):
+            predictions[i] = self.predict(window)[0]
+            window[0, :-1] = window[0, 1:]
+            window[0, -1, 0] = predictions[i]
+        return predictions
+
+
+class MinMaxScaling:
+    """MinMaxScaler(feature_range=(0, 1)) for one column, rebuilt from the exported data_min/data_max."""
+
+    def __init__(self, data_min: float, data_max: float):
+        data_range = float(data_max) - float(data_min)
+        # Same as sklearn: a constant series is scaled by 1 instead of dividing by zero
+        self.scale = 1.0 / data_range if data_range != 0 else 1.0
+        self.min = -float(data_min) * self.scale
+
+    @classmethod
+    def from_arrays(cls, arrays) -> "MinMaxScaling":
+        return cls(float(arrays["scaler_min"]), float(arrays["scaler_max"]))
+
+    def transform(self, values) -> np.ndarray:
+        return np.asarray(values, dtype=np.float64) * self.scale + self.min
+
+    def inverse_transform(self, values) -> np.ndarray:
+        return (np.asarray(values, dtype=np.float64) - self.min) / self.scale
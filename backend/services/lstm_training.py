@@ -0,0 +1,118 @@
+# backend/services/lstm_training.py
+#
+# Keras side of the medium-term LSTM. Only imported inside "training" pool
+# workers (see lstm_model._train_in_worker), so TensorFlow and scikit-learn
+# stay out of the API processes; those serve predictions from the exported
+# arrays with lstm_numpy.
+
+import time
+
+import numpy as np
+import tensorflow as tf
+from tensorflow.keras.models import Sequential
+from tensorflow.keras.layers import Dense, LSTM, Dropout
+from tensorflow.keras.callbacks import EarlyStopping
+from sklearn.preprocessing import MinMaxScaler
+from backend.services.lstm_model import lstm_windows
+from backend.services.lstm_numpy import NumpyLSTM
+from backend.services.model_registry import get_model_registry
+
+# Exported weights must reproduce Keras' predictions to within this (scaled units)
+EXPORT_TOLERANCE = 1e-4
+
+
+def window_batches(X, y, batch_size: int = 32, shuffle: bool = True):
+    """tf.data pipeline that copies one batch of windows at a time out of the views (reshuffled per epoch)."""
+    lookback = X.shape[1]
+
+    def batches():
+        order = np.random.permutation(len(y)) if shuffle else np.arange(len(y))
+        for start in range(0, len(order), batch_size):
+            index = order[start:start + batch_size]
+            yield X[index], y[index]
+
+    return tf.data.Dataset.from_generator(
+        batches,
+        output_signature=(
+            tf.TensorSpec(shape=(None, lookback, 1), dtype=tf.float32),
+            tf.TensorSpec(shape=(None,), dtype=tf.float32),
+        ),
+    ).prefetch(tf.data.AUTOTUNE)
+
+
+def build_lstm_model(lookback: int):
+    model = Sequential([
+        LSTM(units=50, return_sequences=True, input_shape=(lookback, 1)),
+        Dropout(0.2),
+        LSTM(units=50),
+        Dropout(0.2),
+        Dense(units=1)
+    ])
+    model.compile(optimizer='adam', loss='mean_squared_error')
+    return model
+
+
+def train_lstm_model(scaled_data, lookback: int):
+    """Fit a fresh model on scaled closes; returns (model, training loss)."""
+    X, y = lstm_windows(scaled_data, lookback)
+
+    model = build_lstm_model(lookback)
+    early_stop = EarlyStopping(monitor='loss', patience=3, restore_best_weights=True)
+    model.fit(window_batches(X, y, batch_size=32), epochs=10, verbose=0, callbacks=[early_stop])
+
+    loss = model.evaluate(window_batches(X, y, batch_size=256, shuffle=False), verbose=0)
+    return model, loss
+
+
+def export_arrays(model, scaler) -> dict[str, np.ndarray]:
+    """Model weights and scaler bounds in the layout NumpyLSTM.from_arrays / MinMaxScaling.from_arrays read."""
+    arrays = {}
+    lstm_layers = [layer for layer in model.layers if isinstance(layer, LSTM)]
+    for i, layer in enumerate(lstm_layers):
+        kernel, recurrent_kernel, bias = layer.get_weights()
+        arrays[f"lstm{i}_kernel"] = kernel
+        arrays[f"lstm{i}_recurrent_kernel"] = recurrent_kernel
+        arrays[f"lstm{i}_bias"] = bias
+    arrays["dense_kernel"], arrays["dense_bias"] = model.layers[-1].get_weights()
+    arrays["scaler_min"] = np.asarray(scaler.data_min_[0])
+    arrays["scaler_max"] = np.asarray(scaler.data_max_[0])
+    return arrays
+
+
+def _check_export(model, arrays, scaled_data, lookback: int) -> float:
+    """Largest difference between Keras and NumPy predictions on the last few training windows."""
+    X, _ = lstm_windows(scaled_data, lookback)
+    windows = np.array(X[-8:])
+    expected = model(windows, training=False).numpy()[:, 0]
+    actual = NumpyLSTM.from_arrays(arrays).predict(windows)
+    return float(np.max(np.abs(expected - actual)))
+
+
+def train_and_save(symbol: str, period: str, lookback: int, closes: np.ndarray, last_bar: str):
+    """Train on closes (one column) and save the model to the registry; returns (arrays, meta).
+
+    The arrays come back with the meta so the caller can serve this run even if saving failed.
+    """
+    scaler = MinMaxScaler(feature_range=(0, 1))
+    scaled_data = scaler.fit_transform(closes.reshape(-1, 1))
+    model, loss = train_lstm_model(scaled_data, lookback)
+
+    arrays = export_arrays(model, scaler)
+    drift = _check_export(model, arrays, scaled_data, lookback)
+    if drift > EXPORT_TOLERANCE:
+        raise RuntimeError(f"Exported LSTM weights for {symbol} disagree with Keras by {drift:.2e}")
+
+    meta = {
+        "symbol": symbol,
+        "period": period,
+        "lookback": lookback,
+        "last_bar": last_bar,
+        "bars": len(closes),
+        "loss": float(loss),
+        "saved_at": time.time(),
+    }
+    try:
+        get_model_registry().save(symbol, period, lookback, arrays, meta)
+    except Exception as e:
+        print(f"[WARN] Could not save LSTM model for {symbol}: {e}")
+    return arrays, meta
@@ -0,0 +1,234 @@
+# backend/services/market_data.py
+#
+# Market-data providers. Everything above this module (data_service and the
+# routers) only sees normalised OHLCV frames, so swapping vendors or replaying
+# recorded data offline is a matter of MARKET_DATA_PROVIDER. With
+# MARKET_DATA_RECORD=1 every download from a live provider is also written to
+# the replay fixtures (see record_bars.py for recording a set up front).
+
+import os
+import re
+from abc import ABC, abstractmethod
+
+import pandas as pd
+
+from backend.services.bar_cache import BarCache, period_start
+
+MARKET_DATA_PROVIDER = os.getenv("MARKET_DATA_PROVIDER", "yfinance")
+REPLAY_DATA_DIR = os.getenv(
+    "REPLAY_DATA_DIR",
+    os.path.join(os.path.dirname(__file__), "..", "fixtures", "bars"),
+)
+REPLAY_NOW = os.getenv("REPLAY_NOW")
+MARKET_DATA_RECORD = os.getenv("MARKET_DATA_RECORD", "").lower() in ("1", "true", "yes")
+
+
+def clean_yfinance_columns(df: pd.DataFrame, symbol_with_suffix: str) -> pd.DataFrame:
+    if isinstance(df.columns, pd.MultiIndex):
+        print(f"[DEBUG] Flattening MultiIndex columns for {symbol_with_suffix}")
+        # Newer yfinance puts the price field on level 0 and the ticker on level 1
+        field_level = 0 if "Close" in df.columns.get_level_values(0) else 1
+        df.columns = df.columns.get_level_values(field_level)
+
+    if all(col == symbol_with_suffix for col in df.columns):
+        print(f"[DEBUG] All columns are symbol for {symbol_with_suffix}, resetting headers.")
+        possible_headers = [
+            ['Open', 'High', 'Low', 'Close', 'Volume'],
+            ['Open', 'High', 'Low', 'Close', 'Adj Close', 'Volume']
+        ]
+        for headers in possible_headers:
+            if len(headers) == len(df.columns):
+                df.columns = headers
+                return df
+        raise ValueError(f"Header mismatch for symbol {symbol_with_suffix}")
+    return df
+
+
+class MarketDataProvider(ABC):
+    """Source of OHLCV bars. Either `period` or `start` (YYYY-MM-DD) is given."""
+
+    name = "base"
+
+    def now(self) -> pd.Timestamp:
+        """Naive UTC "current time" that periods are measured back from."""
+        return pd.Timestamp.now("UTC").tz_localize(None)
+
+    @abstractmethod
+    def download(self, symbol: str, interval: str, period: str | None = None, start: str | None = None) -> pd.DataFrame | None:
+        ...
+
+    def download_many(self, symbols: list[str], interval: str, period: str | None = None, start: str | None = None) -> dict[str, pd.DataFrame]:
+        frames = {}
+        for symbol in symbols:
+            df = self.download(symbol, interval, period=period, start=start)
+            if df is not None:
+                frames[symbol] = df
+        return frames
+
+
+class YFinanceProvider(MarketDataProvider):
+    name = "yfinance"
+
+    def download(self, symbol, interval, period=None, start=None):
+        import yfinance as yf
+
+        kwargs = {"start": start} if start is not None else {"period": period}
+        df = yf.download(symbol, interval=interval, progress=False, **kwargs)
+        if df is None or df.empty:
+            return None
+        df = clean_yfinance_columns(df, symbol)
+        if "Close" not in df.columns:
+            return None
+        return df
+
+    def download_many(self, symbols, interval, period=None, start=None):
+        import yfinance as yf
+
+        kwargs = {"start": start} if start is not None else {"period": period}
+        raw = yf.download(symbols, interval=interval, group_by="ticker", threads=True, progress=False, **kwargs)
+        frames = {}
+        if raw is None or raw.empty:
+            return frames
+
+        for symbol in symbols:
+            if isinstance(raw.columns, pd.MultiIndex):
+                if symbol not in raw.columns.get_level_values(0):
+                    continue
+                df = raw[symbol]
+            else:
+                df = raw
+            # Symbols from different exchanges are aligned on one index, so drop their padding rows
+            df = df.dropna(how="all")
+            if df.empty or "Close" not in df.columns:
+                continue
+            frames[symbol] = df
+        return frames
+
+
+class ReplayProvider(MarketDataProvider):
+    """Serves recorded bars from `<root>/<SYMBOL>__<interval>.csv` (or `<SYMBOL>.csv`).
+
+    The replay clock is REPLAY_NOW, or else the last bar across all recordings,
+    so periods like "1y" keep selecting the same bars however old the fixtures are.
+    """
+
+    name = "replay"
+
+    def __init__(self, root: str = REPLAY_DATA_DIR, now: str | None = REPLAY_NOW):
+        self.root = os.path.abspath(root)
+        self._now = pd.Timestamp(now) if now else None
+
+    def _path(self, symbol: str, interval: str | None = None) -> str:
+        safe_symbol = re.sub(r"[^A-Za-z0-9._-]", "_", symbol.upper())
+        suffix = f"__{interval}" if interval else ""
+        return os.path.join(self.root, f"{safe_symbol}{suffix}.csv")
+
+    @staticmethod
+    def _read(path: str) -> pd.DataFrame | None:
+        df = pd.read_csv(path, index_col=0, parse_dates=True)
+        return df.sort_index() if "Close" in df.columns and not df.empty else None
+
+    def _load(self, symbol: str, interval: str) -> pd.DataFrame | None:
+        for path in (self._path(symbol, interval), self._path(symbol)):
+            if os.path.exists(path):
+                return self._read(path)
+        return None
+
+    def now(self) -> pd.Timestamp:
+        if self._now is None:
+            last_bars = []
+            if os.path.isdir(self.root):
+                for name in os.listdir(self.root):
+                    if name.endswith(".csv"):
+                        df = self._read(os.path.join(self.root, name))
+                        if df is not None:
+                            last_bars.append(_naive_utc(df.index[-1]))
+            self._now = max(last_bars) if last_bars else super().now()
+        return self._now
+
+    def download(self, symbol, interval, period=None, start=None):
+        df = self._load(symbol, interval)
+        if df is None:
+            return None
+
+        cutoff = pd.Timestamp(start) if start is not None else period_start(period, now=self.now())
+        if cutoff is None:
+            return df
+        if getattr(df.index, "tz", None) is not None:
+            cutoff = cutoff.tz_localize("UTC").tz_convert(df.index.tz)
+        df = df[df.index >= cutoff]
+        return None if df.empty else df
+
+    def record(self, symbol: str, interval: str, df: pd.DataFrame):
+        """Add bars to the recording for (symbol, interval), newer rows winning on overlap."""
+        if getattr(df.index, "tz", None) is not None:
+            # One offset for every row, so the CSV parses back into a DatetimeIndex across DST changes
+            df = df.tz_convert("UTC")
+        path = self._path(symbol, interval)
+        if os.path.exists(path):
+            recorded = self._read(path)
+            if recorded is not None:
+                df = BarCache.merge(recorded, df)
+        os.makedirs(self.root, exist_ok=True)
+        df.to_csv(path)
+
+
+class RecordingProvider(MarketDataProvider):
+    """Wraps a live provider and records every frame it returns into the replay fixtures."""
+
+    def __init__(self, provider: MarketDataProvider, recorder: ReplayProvider | None = None):
+        self.provider = provider
+        self.recorder = recorder or ReplayProvider()
+        # Same bar-cache namespace as the wrapped provider
+        self.name = provider.name
+
+    def now(self) -> pd.Timestamp:
+        return self.provider.now()
+
+    def _record(self, symbol: str, interval: str, df: pd.DataFrame):
+        try:
+            self.recorder.record(symbol, interval, df)
+        except Exception as e:
+            print(f"[WARN] Could not record bars for {symbol} ({interval}): {e}")
+
+    def download(self, symbol, interval, period=None, start=None):
+        df = self.provider.download(symbol, interval, period=period, start=start)
+        if df is not None:
+            self._record(symbol, interval, df)
+        return df
+
+    def download_many(self, symbols, interval, period=None, start=None):
+        frames = self.provider.download_many(symbols, interval, period=period, start=start)
+        for symbol, df in frames.items():
+            self._record(symbol, interval, df)
+        return frames
+
+
+def _naive_utc(ts: pd.Timestamp) -> pd.Timestamp:
+    return ts.tz_convert("UTC").tz_localize(None) if ts.tzinfo is not None else ts
+
+
+PROVIDERS = {
+    "yfinance": YFinanceProvider,
+    "replay": ReplayProvider,
+}
+
+_provider: MarketDataProvider | None = None
+
+
+def get_provider() -> MarketDataProvider:
+    global _provider
+    if _provider is None:
+        if MARKET_DATA_PROVIDER not in PROVIDERS:
+            raise ValueError(f"Unknown MARKET_DATA_PROVIDER: {MARKET_DATA_PROVIDER}")
+        _provider = PROVIDERS[MARKET_DATA_PROVIDER]()
+        if MARKET_DATA_RECORD and MARKET_DATA_PROVIDER != "replay":
+            print(f"[DEBUG] Recording market data to {REPLAY_DATA_DIR}")
+            _provider = RecordingProvider(_provider)
+        print(f"[DEBUG] Using market data provider: {_provider.name}")
+    return _provider
+
+
+def set_provider(provider: MarketDataProvider):
+    global _provider
+    _provider = provider
@@ -0,0 +1,105 @@
+# backend/services/model_registry.py
+#
+# On-disk store of trained medium-term models. One directory per
+# (symbol, period, lookback) holds the model's weights and the fitted scaler's
+# bounds as plain arrays for NumPy inference, and a meta.json describing what
+# the model was trained on, so requests can reuse a model until enough new
+# bars arrive or it expires.
+
+import json
+import os
+import re
+import shutil
+import time
+
+import numpy as np
+import pandas as pd
+
+MODEL_REGISTRY_DIR = os.getenv(
+    "MODEL_REGISTRY_DIR",
+    os.path.join(os.path.dirname(__file__), "..", "cache", "models"),
+)
+# ⏱ Retrain once this many bars arrived after the last training bar, or the model is this old
+MODEL_RETRAIN_BARS = int(os.getenv("MODEL_RETRAIN_BARS", 5))
+MODEL_MAX_AGE = float(os.getenv("MODEL_MAX_AGE", 7 * 24 * 3600))
+
+ARRAYS_FILE = "model.npz"
+META_FILE = "meta.json"
+
+
+class ModelRegistry:
+    def __init__(self, root: str = MODEL_REGISTRY_DIR):
+        self.root = os.path.abspath(root)
+
+    def path(self, symbol: str, period: str, lookback: int) -> str:
+        safe_symbol = re.sub(r"[^A-Za-z0-9._-]", "_", symbol.upper())
+        return os.path.join(self.root, f"{safe_symbol}__{period}__lb{lookback}")
+
+    def load_meta(self, symbol: str, period: str, lookback: int) -> dict | None:
+        """meta.json of a complete saved model, or None."""
+        path = os.path.join(self.path(symbol, period, lookback), META_FILE)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"[WARN] Unreadable model meta {path}: {e}")
+            return None
+
+    def load_arrays(self, symbol: str, period: str, lookback: int) -> dict[str, np.ndarray]:
+        """Exported weights and scaler bounds; raises FileNotFoundError for models saved before the export existed."""
+        path = os.path.join(self.path(symbol, period, lookback), ARRAYS_FILE)
+        with np.load(path) as arrays:
+            return dict(arrays)
+
+    def save(self, symbol: str, period: str, lookback: int, arrays: dict, meta: dict):
+        """Write a trained model: arrays (lstm_training.export_arrays) go to model.npz.
+
+        Files go to a temporary directory that replaces the old one in one rename,
+        so readers never see arrays from one training run and meta from another.
+        meta must include "last_bar" (last training bar) and "saved_at" (epoch seconds).
+        """
+        final = self.path(symbol, period, lookback)
+        tmp = f"{final}.tmp{os.getpid()}"
+        shutil.rmtree(tmp, ignore_errors=True)
+        os.makedirs(tmp)
+
+        np.savez(os.path.join(tmp, ARRAYS_FILE), **arrays)
+        with open(os.path.join(tmp, META_FILE), "w") as f:
+            json.dump(meta, f)
+
+        old = f"{final}.old{os.getpid()}"
+        if os.path.exists(final):
+            os.replace(final, old)
+        os.replace(tmp, final)
+        shutil.rmtree(old, ignore_errors=True)
+
+    @staticmethod
+    def staleness(meta: dict | None, index: pd.Index) -> str | None:
+        """Why a model needs retraining for bars `index`, or None if it can be reused."""
+        if meta is None:
+            return "no saved model"
+        if time.time() - meta.get("saved_at", 0) > MODEL_MAX_AGE:
+            return "model expired"
+
+        last_bar = pd.Timestamp(meta["last_bar"])
+        tz = getattr(index, "tz", None)
+        if tz is not None and last_bar.tzinfo is None:
+            last_bar = last_bar.tz_localize(tz)
+        elif tz is None and last_bar.tzinfo is not None:
+            last_bar = last_bar.tz_convert("UTC").tz_localize(None)
+        new_bars = int((index > last_bar).sum())
+        if new_bars >= MODEL_RETRAIN_BARS:
+            return f"{new_bars} new bars"
+        return None
+
+
+_registry: ModelRegistry | None = None
+
+
+def get_model_registry() -> ModelRegistry:
+    global _registry
+    if _registry is None:
+        _registry = ModelRegistry()
+    return _registry
@@ -1,8 +1,249 @@
+import warnings
 import numpy as np
 import pandas as pd
-from typing import Dict
+from typing import Dict, List, Sequence
+from backend.services.helpers.technical_indicators import compute_frame_indicators, last_valid
 
-def monte_carlo_simulation(data: pd.DataFrame, period: str = "5y", simulations: int = 1000) -> Dict:
+# 📊 Percentiles returned per day when only the fan chart is needed
+BAND_PERCENTILES = (5, 25, 50, 75, 95)
+
+# Upper bound on the per-chunk (days, paths, assets) shock tensor in portfolio simulations
+PORTFOLIO_CHUNK_BYTES = 64 * 1024 * 1024
+
+SAMPLING_METHODS = ("pseudo", "antithetic", "sobol")
+
+# End-price quantiles behind the Buy/Hold/Sell decision (worst and best case)
+DECISION_QUANTILES = (0.05, 0.95)
+
+# Independent batches needed before the adaptive mode trusts its error estimate
+MIN_REPLICATES = 4
+
+# Streaming mode: paths generated per chunk, and how many whole paths are kept for bands/samples
+STREAM_CHUNK_PATHS = 4096
+STREAM_KEEP_PATHS = 2000
+
+class NormalSampler:
+    """Standard-normal shocks of shape (steps, n) drawn as plain pseudo-random numbers,
+    antithetic pairs (z, -z) or scrambled Sobol points. Each draw() is an independent
+    replicate (Sobol points are re-scrambled), which is what the adaptive error estimate needs.
+    """
+
+    def __init__(self, steps: int, sampling: str = "pseudo", rng: np.random.Generator | None = None):
+        if sampling not in SAMPLING_METHODS:
+            raise ValueError(f"Unknown sampling method: {sampling}")
+        self.steps = steps
+        self.sampling = sampling
+        self.rng = rng if rng is not None else np.random.default_rng()
+
+    def draw(self, n: int, dtype=np.float64) -> np.ndarray:
+        if self.steps == 0:
+            return np.empty((0, n), dtype=dtype)
+        if self.sampling == "antithetic":
+            half = self.rng.standard_normal((self.steps, (n + 1) // 2), dtype=dtype)
+            return np.concatenate([half, -half], axis=1)[:, :n]
+        if self.sampling == "sobol":
+            from scipy.stats import norm, qmc
+
+            with warnings.catch_warnings():
+                # Scrambled points stay unbiased for any n; powers of two just balance best
+                warnings.simplefilter("ignore", UserWarning)
+                points = qmc.Sobol(d=self.steps, scramble=True, seed=self.rng).random(n)
+            return norm.ppf(np.clip(points, 1e-12, 1 - 1e-12)).T.astype(dtype, copy=False)
+        return self.rng.standard_normal((self.steps, n), dtype=dtype)
+
+
+def _paths_from_normals(last_price: float, mean_return: float, std_dev: float, shocks: np.ndarray) -> np.ndarray:
+    price_paths = np.empty((shocks.shape[0] + 1, shocks.shape[1]), dtype=shocks.dtype)
+    price_paths[0] = last_price
+    if shocks.shape[0]:
+        # NumPy scalars would promote float32 shocks to float64 chunks
+        mean_return, std_dev = shocks.dtype.type(mean_return), shocks.dtype.type(std_dev)
+        growth = shocks * std_dev
+        growth += 1 + mean_return
+        np.cumprod(growth, axis=0, out=price_paths[1:])
+        price_paths[1:] *= last_price
+    return price_paths
+
+
+def simulate_price_paths(last_price: float, mean_return: float, std_dev: float, days: int, simulations: int,
+                         rng: np.random.Generator | None = None, sampling: str = "pseudo", dtype=np.float64) -> np.ndarray:
+    """(days, simulations) matrix of price paths starting at last_price, built in one draw."""
+    shocks = NormalSampler(days - 1, sampling, rng).draw(simulations, dtype)
+    return _paths_from_normals(last_price, mean_return, std_dev, shocks)
+
+
+def simulate_end_prices(last_price: float, mean_return: float, std_dev: float, days: int, simulations: int,
+                        keep_paths: int = STREAM_KEEP_PATHS, chunk_size: int = STREAM_CHUNK_PATHS,
+                        rng: np.random.Generator | None = None, sampling: str = "pseudo", dtype=np.float64,
+                        sampler: NormalSampler | None = None):
+    """Streaming simulation: returns (first `keep_paths` paths, every end price).
+
+    Paths are generated `chunk_size` at a time, so the path matrix never exceeds
+    days * chunk_size values; only one end price per simulation is kept beyond that. Paths are
+    i.i.d., so the kept ones are an unbiased sample for fan bands, while the decision
+    percentiles use all end prices.
+    """
+    sampler = sampler if sampler is not None else NormalSampler(days - 1, sampling, rng)
+    end_prices = np.empty(simulations, dtype=dtype)
+    kept, n_kept = [], 0
+
+    for lo in range(0, simulations, chunk_size):
+        paths = _paths_from_normals(last_price, mean_return, std_dev, sampler.draw(min(chunk_size, simulations - lo), dtype))
+        end_prices[lo:lo + paths.shape[1]] = paths[-1]
+        if n_kept < keep_paths:
+            kept.append(paths[:, :keep_paths - n_kept].copy())
+            n_kept += kept[-1].shape[1]
+
+    kept_paths = np.concatenate(kept, axis=1) if kept else np.empty((days, 0), dtype=dtype)
+    return kept_paths, end_prices
+
+
+def simulate_price_paths_adaptive(last_price: float, mean_return: float, std_dev: float, days: int, tolerance: float,
+                                  batch_size: int = 1024, max_simulations: int = 20000,
+                                  rng: np.random.Generator | None = None, sampling: str = "pseudo",
+                                  quantiles: Sequence[float] = DECISION_QUANTILES,
+                                  keep_paths: int | None = None, dtype=np.float64):
+    """Adds independent batches of paths until the standard error of every end-price quantile in
+    `quantiles` (estimated from the spread of per-batch estimates, so antithetic and Sobol gains
+    are credited) puts it within +/- tolerance * last_price at 95% confidence.
+
+    Returns (paths, end prices). With keep_paths=None every path is kept; otherwise batches are
+    streamed and only the first `keep_paths` paths survive.
+    """
+    if sampling == "sobol":
+        # Sobol points are only balanced in powers of two
+        batch_size = 1 << max(batch_size - 1, 1).bit_length()
+
+    sampler = NormalSampler(days - 1, sampling, rng)
+    kept, end_batches, estimates, total, n_kept = [], [], [], 0, 0
+    while total < max_simulations:
+        n = min(batch_size, max_simulations - total)
+        if keep_paths is None:
+            batch = _paths_from_normals(last_price, mean_return, std_dev, sampler.draw(n, dtype))
+            kept.append(batch)
+            batch_end = batch[-1]
+        else:
+            batch, batch_end = simulate_end_prices(
+                last_price, mean_return, std_dev, days, n, keep_paths=keep_paths - n_kept, dtype=dtype, sampler=sampler,
+            )
+            if batch.shape[1]:
+                kept.append(batch)
+                n_kept += batch.shape[1]
+        end_batches.append(batch_end)
+        estimates.append(np.percentile(batch_end, [q * 100 for q in quantiles]))
+        total += n
+
+        if len(estimates) >= MIN_REPLICATES:
+            std_err = np.std(estimates, axis=0, ddof=1) / np.sqrt(len(estimates))
+            if np.all(1.96 * std_err <= tolerance * last_price):
+                break
+
+    print(f"[DEBUG] Adaptive Monte Carlo stopped after {total} paths")
+    return np.concatenate(kept, axis=1), np.concatenate(end_batches)
+
+
+def simulate_from_closes(closes: np.ndarray, days: int, simulations: int, sampling: str = "pseudo",
+                         tolerance: float | None = None, max_simulations: int = 20000, seed: int | None = None,
+                         streaming: bool = False, dtype: str = "float64"):
+    """Fit daily returns from a close-price array and simulate.
+
+    Returns (paths, 5th pct, 95th pct, simulations run). In streaming mode `paths` holds only
+    the first STREAM_KEEP_PATHS paths. Takes and returns plain arrays so it can run in a
+    worker process.
+    """
+    returns = closes[1:] / closes[:-1] - 1
+    returns = returns[np.isfinite(returns)]
+    mean_return = returns.mean()
+    std_dev = returns.std(ddof=1)
+
+    last_price = closes[-1]
+    rng = np.random.default_rng(seed)
+    dtype = np.dtype(dtype)
+    keep_paths = STREAM_KEEP_PATHS if streaming else None
+    if tolerance is not None:
+        price_paths, end_prices = simulate_price_paths_adaptive(
+            last_price, mean_return, std_dev, days, tolerance,
+            batch_size=simulations, max_simulations=max(max_simulations, simulations), rng=rng, sampling=sampling,
+            keep_paths=keep_paths, dtype=dtype,
+        )
+    elif streaming:
+        price_paths, end_prices = simulate_end_prices(
+            last_price, mean_return, std_dev, days, simulations, rng=rng, sampling=sampling, dtype=dtype,
+        )
+    else:
+        price_paths = simulate_price_paths(
+            last_price, mean_return, std_dev, days, simulations, rng=rng, sampling=sampling, dtype=dtype,
+        )
+        end_prices = price_paths[-1]
+
+    worst_case, best_case = np.percentile(end_prices, [5, 95])
+    return price_paths, worst_case, best_case, len(end_prices)
+
+
+def _cholesky(cov: np.ndarray) -> np.ndarray:
+    try:
+        return np.linalg.cholesky(cov)
+    except np.linalg.LinAlgError:
+        # Collinear or short histories give a singular covariance; clip it to the nearest PSD matrix
+        eigvals, eigvecs = np.linalg.eigh(cov)
+        eigvals = np.clip(eigvals, 1e-12, None)
+        return eigvecs * np.sqrt(eigvals)
+
+
+def simulate_portfolio(closes: pd.DataFrame, weights: Sequence[float], days: int, simulations: int,
+                       initial_value: float = 100.0, rng: np.random.Generator | None = None,
+                       keep_paths: int | None = None, dtype=np.float64):
+    """Buy-and-hold portfolio values under correlated daily returns; returns (paths, end values).
+
+    `closes` holds one aligned close-price column per asset. Returns are drawn from a
+    multivariate normal with the sample mean and covariance of the historical daily returns,
+    in path chunks so the (days, paths, assets) shock tensor stays within PORTFOLIO_CHUNK_BYTES.
+    With keep_paths=None `paths` is the full (days, simulations) matrix; otherwise only the first
+    `keep_paths` paths are kept, as in simulate_end_prices.
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    dtype = np.dtype(dtype)
+
+    returns = closes.pct_change().dropna().to_numpy()
+    mean_returns = returns.mean(axis=0).astype(dtype)
+    chol = _cholesky(np.atleast_2d(np.cov(returns, rowvar=False))).astype(dtype)
+    weights = np.asarray(weights, dtype=float)
+    scaled_weights = (weights * initial_value).astype(dtype)
+    n_assets = len(weights)
+
+    keep = simulations if keep_paths is None else min(keep_paths, simulations)
+    paths = np.empty((days, keep), dtype=dtype)
+    paths[0] = initial_value
+    end_values = np.full(simulations, initial_value, dtype=dtype)
+    steps = days - 1
+    if steps == 0:
+        return paths, end_values
+
+    chunk = max(1, PORTFOLIO_CHUNK_BYTES // (steps * n_assets * dtype.itemsize))
+    for lo in range(0, simulations, chunk):
+        hi = min(lo + chunk, simulations)
+        shocks = rng.standard_normal((steps, hi - lo, n_assets), dtype=dtype)
+        growth = shocks @ chol.T
+        growth += mean_returns + 1
+        np.cumprod(growth, axis=0, out=growth)
+        if hi <= keep:
+            values = np.matmul(growth, scaled_weights, out=paths[1:, lo:hi])
+        else:
+            values = growth @ scaled_weights
+            if lo < keep:
+                paths[1:, lo:keep] = values[:, :keep - lo]
+        end_values[lo:hi] = values[-1]
+    return paths, end_values
+
+
+def percentile_bands(price_paths: np.ndarray, percentiles: Sequence[float] = BAND_PERCENTILES) -> Dict[str, List[float]]:
+    """Per-day percentiles across simulations, keyed "p5", "p25", ..."""
+    bands = np.percentile(price_paths, percentiles, axis=1)
+    # Unrounded: fixed decimals would flatten the bands of sub-dollar assets (penny stocks, crypto pairs)
+    return {f"p{p:g}": band.tolist() for p, band in zip(percentiles, bands)}
+
+
+def monte_carlo_simulation(data: pd.DataFrame, period: str = "5y", simulations: int = 1000, sampling: str = "pseudo") -> Dict:
     returns = data['Close'].pct_change().dropna()
     mean_return = returns.mean()
     std_dev = returns.std()
@@ -11,23 +252,17 @@ def monte_carlo_simulation(data: pd.DataFrame, period: str = "5y", simulations:
     years = int(period.replace("y", ""))
     days = 252 * years
 
-    simulation_data = np.zeros((days, simulations))
-    simulation_data[0] = last_price
+    # Only the end prices are used here, so never hold the full path matrix
+    _, end_prices = simulate_end_prices(last_price, mean_return, std_dev, days, simulations, keep_paths=0, sampling=sampling)
 
-    for t in range(1, days):
-        random_returns = np.random.normal(mean_return, std_dev, simulations)
-        simulation_data[t] = simulation_data[t - 1] * (1 + random_returns)
-
-    end_prices = simulation_data[-1]
     worst_case = np.percentile(end_prices, 5)
     best_case = np.percentile(end_prices, 95)
     expected_return = np.mean(end_prices)
 
-    data['SMA200'] = data['Close'].rolling(window=200).mean()
-    sma200 = data['SMA200'].iloc[-1] if not data['SMA200'].isna().all() else None
-
-    rolling_vol = returns.rolling(window=60).std()
-    volatility = rolling_vol.iloc[-1] * np.sqrt(252) if not rolling_vol.isna().all() else None
+    ind = compute_frame_indicators(data, ("sma200", "volatility"), volatility_window=60)
+    sma200 = last_valid(ind["sma200"])
+    volatility = last_valid(ind["volatility"])
+    volatility = volatility * np.sqrt(252) if volatility is not None else None
 
     if worst_case > last_price * 0.9:
         decision = "Buy"
@@ -0,0 +1,115 @@
+# backend/services/news_ingest.py
+#
+# Background news ingestion: every NEWS_INGEST_INTERVAL seconds a daemon thread
+# pulls and scores news for the watchlist plus the most requested symbols and
+# writes the per-symbol sentiment into the news_sentiment table (and the
+# in-memory cache), so request handlers mostly read precomputed values.
+# With several server workers only the one holding NEWS_INGEST_LOCK ingests;
+# the others retry the lock each interval and take over if that worker exits.
+# "Most requested" is counted per process, so the leader only sees requests
+# its own worker served; put symbols that must always be warm in NEWS_WATCHLIST.
+
+import os
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows: no flock, assume a single worker
+    fcntl = None
+
+from backend.services.sentiment import decay_interest, popular_symbols, refresh_news
+
+NEWS_INGEST_ENABLED = os.getenv("NEWS_INGEST_ENABLED", "false").lower() in ("1", "true", "yes")
+# Keep this below SENTIMENT_TTL so stored values never go stale between runs
+NEWS_INGEST_INTERVAL = float(os.getenv("NEWS_INGEST_INTERVAL", 10 * 60))
+NEWS_WATCHLIST = [s.strip().upper() for s in os.getenv("NEWS_WATCHLIST", "").split(",") if s.strip()]
+NEWS_INGEST_POPULAR = int(os.getenv("NEWS_INGEST_POPULAR", 20))
+# Deadline for one run's fetches; runs are off the request path so this can be generous
+NEWS_INGEST_DEADLINE = float(os.getenv("NEWS_INGEST_DEADLINE", 60))
+NEWS_INGEST_LOCK = os.getenv(
+    "NEWS_INGEST_LOCK",
+    os.path.join(os.path.dirname(__file__), "..", "cache", "news_ingest.lock"),
+)
+
+
+def ingest_symbols() -> list[str]:
+    return list(dict.fromkeys(NEWS_WATCHLIST + popular_symbols(NEWS_INGEST_POPULAR)))
+
+
+def ingest_once(symbols: list[str] | None = None) -> dict:
+    """Fetch, score and store sentiment for symbols (default: watchlist + popular); returns the decisions."""
+    symbols = ingest_symbols() if symbols is None else symbols
+    if not symbols:
+        return {}
+
+    started = time.monotonic()
+    decisions = refresh_news(symbols, deadline=NEWS_INGEST_DEADLINE)
+    print(f"[INGEST] Stored sentiment for {len(decisions)}/{len(symbols)} symbols "
+          f"in {time.monotonic() - started:.1f}s")
+    return decisions
+
+
+class NewsIngestWorker:
+    def __init__(self, interval: float = NEWS_INGEST_INTERVAL, lock_path: str | None = NEWS_INGEST_LOCK):
+        self.interval = interval
+        self.lock_path = lock_path
+        self._lock_file = None
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def _is_leader(self) -> bool:
+        """Whether this process holds the ingest lock, taking it if it is free.
+
+        The lock stays held for the life of the process; the OS drops it when the process exits.
+        """
+        if self._lock_file is not None or fcntl is None or not self.lock_path:
+            return True
+        os.makedirs(os.path.dirname(os.path.abspath(self.lock_path)), exist_ok=True)
+        lock_file = open(self.lock_path, "a")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        self._lock_file = lock_file
+        print(f"[INGEST] Worker {os.getpid()} is running news ingestion")
+        return True
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="news-ingest", daemon=True)
+        self._thread.start()
+        print(f"[INGEST] News ingestion every {self.interval:.0f}s")
+
+    def stop(self, timeout: float | None = None):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        if self._lock_file is not None:
+            self._lock_file.close()
+            self._lock_file = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                if self._is_leader():
+                    ingest_once()
+                decay_interest()
+            except Exception as e:
+                # One bad run shouldn't end ingestion
+                print(f"[ERROR] News ingestion run failed: {e}")
+            self._stop.wait(self.interval)
+
+
+_worker = NewsIngestWorker()
+
+
+def start():
+    _worker.start()
+
+
+def stop():
+    _worker.stop(timeout=5)
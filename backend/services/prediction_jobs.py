@@ -0,0 +1,115 @@
+# backend/services/prediction_jobs.py
+#
+# Medium-term predictions as background jobs. Each symbol's prediction runs on
+# a thread here (NumPy inference on saved models) and only hands training off
+# to the "training" process pool; a job groups the symbols of one request and
+# can be polled by id. A symbol already being predicted with the same
+# parameters is attached to the running work instead of starting a second run.
+
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from backend.services.helpers.cache import TTLCache
+from backend.services.lstm_model import predict_lstm
+
+# Finished jobs stay pollable for this long
+JOB_RESULT_TTL = float(os.getenv("JOB_RESULT_TTL", 3600))
+# Finished jobs kept, counted in symbol predictions (each holds a base64 chart); oldest go first
+JOB_RESULT_MAX_PREDICTIONS = int(os.getenv("JOB_RESULT_MAX_PREDICTIONS", 500))
+# Threads mostly wait on data fetches or on the training pool; inference itself is a few ms of NumPy
+PREDICTION_THREADS = int(os.getenv("PREDICTION_THREADS", 8))
+
+_prediction_pool = ThreadPoolExecutor(max_workers=PREDICTION_THREADS, thread_name_prefix="predict")
+
+# Running jobs are never evicted; they move to _finished_jobs once every prediction is done
+_running_jobs: dict[str, dict] = {}
+_finished_jobs = TTLCache(ttl=JOB_RESULT_TTL, maxsize=JOB_RESULT_MAX_PREDICTIONS,
+                          sizeof=lambda job: len(job["predictions"]))
+_active: dict[tuple, Future] = {}
+_lock = threading.Lock()
+
+
+def _submit_prediction(smart_symbol: str, period: str, future_days: int) -> Future:
+    return _prediction_pool.submit(predict_lstm, smart_symbol, period, future_days=future_days)
+
+
+def _prediction_future(smart_symbol: str, period: str, future_days: int) -> Future:
+    key = (smart_symbol, period, future_days)
+    with _lock:
+        future = _active.get(key)
+        if future is not None:
+            print(f"[DEBUG] Attaching to running prediction for {smart_symbol}")
+            return future
+        future = _active[key] = _submit_prediction(smart_symbol, period, future_days)
+
+    def release(done):
+        with _lock:
+            if _active.get(key) is done:
+                del _active[key]
+
+    future.add_done_callback(release)
+    return future
+
+
+def _finish(job_id: str):
+    with _lock:
+        job = _running_jobs.get(job_id)
+        if job is None or not all(f.done() for _, f in job["predictions"]):
+            return
+        job["finished_at"] = time.time()
+        # Stored before it leaves _running_jobs so polling never misses it in between
+        _finished_jobs.set(job_id, job)
+        del _running_jobs[job_id]
+
+
+def submit_job(symbols: list[tuple[str, str]], period: str, future_days: int, track: bool = True) -> dict:
+    """Start predictions for [(symbol, smart_symbol)] and return the new job.
+
+    Only tracked jobs can be polled with get_job; callers that wait on the
+    futures themselves pass track=False so they don't take up result slots.
+    """
+    job = {
+        "job_id": uuid.uuid4().hex,
+        "period": period,
+        "future_days": future_days,
+        "created_at": time.time(),
+        "finished_at": None,
+        "predictions": [
+            (symbol, _prediction_future(smart_symbol, period, future_days)) for symbol, smart_symbol in symbols
+        ],
+    }
+    if not track:
+        return job
+
+    with _lock:
+        _running_jobs[job["job_id"]] = job
+    for _, future in job["predictions"]:
+        future.add_done_callback(lambda _, job_id=job["job_id"]: _finish(job_id))
+    return job
+
+
+def get_job(job_id: str) -> dict | None:
+    with _lock:
+        job = _running_jobs.get(job_id)
+    return job if job is not None else _finished_jobs.get(job_id)
+
+
+def job_status(job: dict) -> str:
+    futures = [future for _, future in job["predictions"]]
+    if all(future.done() for future in futures):
+        return "done"
+    if any(future.running() or future.done() for future in futures):
+        return "running"
+    return "queued"
+
+
+def prediction_outcome(future: Future):
+    """predict_lstm's return value for a finished prediction, or (None, error message) if it raised."""
+    try:
+        return future.result()
+    except Exception as e:
+        print(f"[ERROR] Medium-term prediction failed: {e}")
+        return None, f"Prediction failed: {e}"
@@ -0,0 +1,215 @@
+# backend/services/screener.py
+#
+# Cross-sectional screening: a universe's bars are aligned into time x symbols
+# arrays and the short-term indicators and rules run over every symbol at once.
+
+import os
+import re
+
+import numpy as np
+import pandas as pd
+
+from backend.services.data_service import fetch_many
+from backend.services.helpers.technical_indicators import compute_indicators
+from backend.services.sentiment import (
+    NEUTRAL_DECISION,
+    SENTIMENT_TTL,
+    get_news_decisions,
+    load_stored_sentiments,
+    record_interest,
+)
+from backend.services.short_term_rules import (
+    classify_trend,
+    news_sentiment_score,
+    score_signals,
+    volume_spike,
+)
+
+# Universe files: <UNIVERSE_DIR>/<name>.txt, one symbol per line, "#" starts a comment.
+# fixtures/universes ships "sample" (the symbols with replay bars); add more files alongside it.
+UNIVERSE_DIR = os.getenv(
+    "UNIVERSE_DIR",
+    os.path.join(os.path.dirname(__file__), "..", "fixtures", "universes"),
+)
+
+FIELDS = ("Close", "High", "Low", "Volume")
+
+# RSI, ATR and volatility window, as in the single-symbol short-term endpoint
+RSI_WINDOW = 14
+
+
+def load_universe(name: str) -> list[str]:
+    safe_name = re.sub(r"[^A-Za-z0-9_-]", "_", name.lower())
+    path = os.path.join(UNIVERSE_DIR, f"{safe_name}.txt")
+    if not os.path.exists(path):
+        raise ValueError(f"Unknown universe: {name}")
+
+    symbols = []
+    with open(path) as f:
+        for line in f:
+            symbol = line.split("#", 1)[0].strip().upper()
+            if symbol:
+                symbols.append(symbol)
+    return list(dict.fromkeys(symbols))
+
+
+def request_symbols(symbols: list[str] | None, universe: str | None) -> list[str]:
+    """Symbols of a screener or backtest request: the explicit list if given, else the universe file.
+
+    Returns [] when neither is given; raises ValueError for an unknown universe.
+    """
+    if symbols:
+        return list(dict.fromkeys(s.strip().upper() for s in symbols if s.strip()))
+    if universe:
+        return load_universe(universe)
+    return []
+
+
+def align_to_last_bar(arrays: dict, valid: np.ndarray):
+    """Move each column's valid rows to the bottom, keeping their order.
+
+    Symbols miss different days (holidays, suspensions), so after this every
+    column's latest bars line up on the last rows, like a per-symbol dropna().
+    Returns (aligned arrays, order); restore_alignment(values, order) undoes it.
+    """
+    order = np.argsort(valid, axis=0, kind="stable")
+    return {field: np.take_along_axis(values, order, axis=0) for field, values in arrays.items()}, order
+
+
+def restore_alignment(values: np.ndarray, order: np.ndarray) -> np.ndarray:
+    """Put values computed on align_to_last_bar() arrays back on the original rows."""
+    return np.take_along_axis(values, np.argsort(order, axis=0, kind="stable"), axis=0)
+
+
+def mask_short_history(values: np.ndarray, close: np.ndarray, window: int) -> np.ndarray:
+    """NaN wherever a column has fewer than `window` valid closes so far.
+
+    Indicators that treat missing moves as no move (RSI) would otherwise give
+    symbols padded by align_to_last_bar() values from partial windows, unlike
+    the same symbol's own history.
+    """
+    counts = np.cumsum(~np.isnan(close), axis=0)
+    return np.where(counts >= window, values, np.nan)
+
+
+def frames_to_arrays(frames: dict, symbols: list[str]):
+    """Align per-symbol frames on their union index; returns (index, {field: time x symbols array}, valid mask).
+
+    Fields are NaN wherever a symbol has no bar or is missing its close or volume.
+    """
+    aligned = {field: pd.concat({symbol: frames[symbol][field] for symbol in symbols}, axis=1) for field in FIELDS}
+    index = aligned["Close"].index
+    arrays = {field: frame.to_numpy(dtype=float) for field, frame in aligned.items()}
+    valid = ~(np.isnan(arrays["Close"]) | np.isnan(arrays["Volume"]))
+    for field in FIELDS:
+        arrays[field] = np.where(valid, arrays[field], np.nan)
+    return index, arrays, valid
+
+
+def load_universe_frames(symbols: list[str], exchange: str = "", period: str = "1mo", interval: str = "1d"):
+    """fetch_many for a universe; returns (symbols with full OHLCV frames, frames, errors)."""
+    frames, errors = fetch_many(symbols, exchange, period=period, interval=interval)
+    loaded = [symbol for symbol in symbols if symbol in frames and all(f in frames[symbol].columns for f in FIELDS)]
+    for symbol in symbols:
+        if symbol in frames and symbol not in loaded:
+            errors.setdefault(symbol, "Missing OHLCV columns")
+    return loaded, frames, errors
+
+
+def load_universe_arrays(symbols: list[str], exchange: str = "", period: str = "1mo", interval: str = "1d"):
+    """Bars for a universe as 2D float arrays with every symbol's latest bar on the last row.
+
+    Returns (symbols with data, {field: time x symbols array}, errors).
+    """
+    loaded, frames, errors = load_universe_frames(symbols, exchange, period=period, interval=interval)
+    if not loaded:
+        return [], {}, errors
+
+    _, arrays, valid = frames_to_arrays(frames, loaded)
+    return loaded, align_to_last_bar(arrays, valid)[0], errors
+
+
+def sentiment_scores(symbols: list[str], live: bool = False):
+    """(sentiment score, positive news) arrays plus the news decisions.
+
+    live fetches news for every symbol; otherwise only the sentiment stored by
+    background ingestion is read (one query) and other symbols are neutral.
+    """
+    if live:
+        record_interest(symbols)
+        news = get_news_decisions(symbols)
+        decisions = [news[symbol][0] for symbol in symbols]
+    else:
+        stored = load_stored_sentiments(symbols, SENTIMENT_TTL)
+        decisions = [stored[symbol][0] if symbol in stored else NEUTRAL_DECISION for symbol in symbols]
+    scores = np.array([news_sentiment_score(decision) for decision in decisions])
+    positive = np.array(["Positive" in decision for decision in decisions])
+    return scores, positive, decisions
+
+
+def screen(symbols: list[str], exchange: str = "", period: str = "1mo", risk_tolerance: float = 1.0,
+           include_sentiment: bool = False) -> tuple[list[dict], dict]:
+    """Score every symbol with the short-term rules; returns (rows ranked best first, errors).
+
+    Without include_sentiment no news requests are made: symbols use the
+    sentiment stored by background ingestion, or the neutral score.
+    """
+    loaded, arrays, errors = load_universe_arrays(symbols, exchange, period=period)
+    if not loaded:
+        return [], errors
+
+    close, volume = arrays["Close"], arrays["Volume"]
+    if len(close) < 3:
+        errors.update({symbol: "Not enough data" for symbol in loaded})
+        return [], errors
+
+    bars = (~np.isnan(close)).sum(axis=0)
+    too_short = bars < 3
+    for symbol in np.asarray(loaded)[too_short]:
+        errors[symbol] = "Not enough data"
+
+    ind = compute_indicators(close, arrays["High"], arrays["Low"], indicators=("rsi", "volatility", "atr"),
+                             rsi_window=RSI_WINDOW, atr_window=RSI_WINDOW, volatility_window=RSI_WINDOW)
+    rsi = mask_short_history(ind["rsi"], close, RSI_WINDOW)[-1]
+    # Volatility needs one more bar than its window of returns
+    volatility = mask_short_history(ind["volatility"], close, RSI_WINDOW + 1)[-1]
+    atr = mask_short_history(ind["atr"], close, RSI_WINDOW)[-1]
+
+    current_price = close[-1]
+    with np.errstate(invalid="ignore"):
+        spike = volume_spike(volume[-1], np.nanmean(volume, axis=0))
+    trend = classify_trend(close[-3], close[-2], close[-1])
+
+    sentiment, positive, news = sentiment_scores(loaded, live=include_sentiment)
+
+    score, confidence, decision = score_signals(trend, rsi, spike, sentiment, positive)
+    stop_loss = current_price - (atr * 1.5 * (2 - risk_tolerance))
+    take_profit = current_price + (atr * 2.5 * risk_tolerance)
+
+    # Best score first, then the bigger volume spike, then the lower RSI
+    ranked = np.lexsort((
+        np.nan_to_num(rsi, nan=np.inf),
+        -np.nan_to_num(spike, nan=-np.inf),
+        -score,
+    ))
+
+    rows = []
+    for i in ranked:
+        if too_short[i]:
+            continue
+        rows.append({
+            "symbol": loaded[i],
+            "current_price": current_price[i],
+            "rsi": rsi[i],
+            "volatility": volatility[i],
+            "volume_spike": spike[i],
+            "stop_loss": stop_loss[i],
+            "take_profit": take_profit[i],
+            "news_sentiment": news[i],
+            "sentiment_score": int(sentiment[i]),
+            "trend": int(trend[i]),
+            "confidence": int(confidence[i]),
+            "score": int(score[i]),
+            "decision": int(decision[i]),
+        })
+    return rows, errors
@@ -1,16 +1,84 @@
+import hashlib
+import json
 import os
+import re
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import datetime, timedelta
 import requests
-from textblob import TextBlob
+from requests.adapters import HTTPAdapter
+from textblob.en.sentiments import PatternAnalyzer
+from backend.services.helpers.cache import TTLCache
+from backend.services.singleflight import SingleFlight
+
+# 🗞 News decisions per symbol: in memory first, then the news_sentiment table, then NewsAPI
+SENTIMENT_TTL = float(os.getenv("SENTIMENT_TTL", 15 * 60))
+# Fallbacks (no API key, failed request) are only remembered briefly and never stored
+SENTIMENT_FALLBACK_TTL = float(os.getenv("SENTIMENT_FALLBACK_TTL", 60))
+SENTIMENT_STORE_ENABLED = os.getenv("SENTIMENT_STORE", "db").lower() != "off"
+
+_sentiment_cache = TTLCache(ttl=SENTIMENT_TTL, maxsize=10_000)
+_sentiment_flights = SingleFlight()
+
+# How often each symbol's news was asked for, so background ingestion can keep popular ones warm.
+# Counts are per process (each server worker only sees its own requests) and capped at
+# NEWS_INTEREST_MAX symbols; symbols that must stay warm in every deployment go in NEWS_WATCHLIST.
+NEWS_INTEREST_MAX = int(os.getenv("NEWS_INTEREST_MAX", 1000))
+_interest = Counter()
+_interest_lock = threading.Lock()
+
+NEUTRAL_DECISION = "🟡 Neutral News - Hold"
+
+# 🌐 One pooled session for NewsAPI; each call has a timeout and a batch of symbols has a deadline
+NEWS_API_URL = "https://newsapi.org/v2/everything"
+NEWS_TIMEOUT = float(os.getenv("NEWS_TIMEOUT", 5))
+NEWS_BATCH_DEADLINE = float(os.getenv("NEWS_BATCH_DEADLINE", 8))
+NEWS_FETCH_WORKERS = int(os.getenv("NEWS_FETCH_WORKERS", 8))
+# Background refreshes get their own few threads so they never queue ahead of request lookups
+NEWS_REFRESH_WORKERS = int(os.getenv("NEWS_REFRESH_WORKERS", 2))
+
+_session = None
+_session_lock = threading.Lock()
+_news_pool = ThreadPoolExecutor(max_workers=NEWS_FETCH_WORKERS, thread_name_prefix="news")
+_refresh_pool = ThreadPoolExecutor(max_workers=NEWS_REFRESH_WORKERS, thread_name_prefix="news-refresh")
+
+def _news_session():
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=NEWS_FETCH_WORKERS)
+            _session.mount("https://", adapter)
+            _session.mount("http://", adapter)
+        return _session
+
+# "newsapi", or "stub" to read canned articles from <NEWS_STUB_DIR>/<SYMBOL>.json offline
+NEWS_SOURCE = os.getenv("NEWS_SOURCE", "newsapi")
+NEWS_STUB_DIR = os.getenv(
+    "NEWS_STUB_DIR",
+    os.path.join(os.path.dirname(__file__), "..", "fixtures", "news"),
+)
+
+def _fetch_stub_news(stock):
+    path = os.path.join(NEWS_STUB_DIR, f"{re.sub(r'[^A-Za-z0-9._-]', '_', stock.upper())}.json")
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return json.load(f)[:5]
+
+def fetch_news(stock, timeout=None):
+    if NEWS_SOURCE == "stub":
+        return _fetch_stub_news(stock)
 
-def fetch_news(stock):
     api_key = os.getenv("NEWS_API_KEY")
     if not api_key:
         print("⚠️ NEWS_API_KEY is missing! Defaulting to no news for:", stock)
         return None  # Updated from [] to None
 
-    url = f"https://newsapi.org/v2/everything?q={stock}&sortBy=publishedAt&apiKey={api_key}"
+    params = {"q": stock, "sortBy": "publishedAt", "apiKey": api_key}
     try:
-        response = requests.get(url)
+        response = _news_session().get(NEWS_API_URL, params=params, timeout=timeout or NEWS_TIMEOUT)
         response.raise_for_status()
         articles = response.json().get("articles", [])
         return articles[:5]
@@ -18,24 +86,236 @@ def fetch_news(stock):
         print(f"⚠️ Failed to fetch news for {stock}: {e}")
         return None  # Updated from [] to None
 
-def analyze_sentiment(text):
-    return TextBlob(text).sentiment.polarity
-
-def get_news_decision(stock):
-    articles = fetch_news(stock)
-    if articles is None:
-        # No API Key or API failed -> Safe fallback
-        return "🟡 Neutral News - Hold", 0
+# Polarity per distinct article (by URL, else by content hash), shared across symbols
+ARTICLE_SCORE_TTL = float(os.getenv("ARTICLE_SCORE_TTL", 24 * 3600))
+_article_scores = TTLCache(ttl=ARTICLE_SCORE_TTL, maxsize=50_000)
+# Same polarity as TextBlob(text).sentiment, without building a blob or collecting assessments
+_analyzer = PatternAnalyzer()
 
-    scores = [analyze_sentiment((a.get("title") or "") + " " + (a.get("description") or "")) for a in articles]
-    avg_score = sum(scores) / len(scores) if scores else 0
+def analyze_sentiment(text):
+    return _analyzer.analyze(text).polarity
 
+def decision_from_score(avg_score):
     if avg_score > 0.15:
-        return "🟢 Positive News - Consider Buying", avg_score
+        return "🟢 Positive News - Consider Buying"
     elif avg_score < -0.15:
-        return "🔴 Negative News - Consider Selling", avg_score
+        return "🔴 Negative News - Consider Selling"
     else:
-        return "🟡 Neutral News - Hold", avg_score
+        return NEUTRAL_DECISION
+
+def article_text(article):
+    return (article.get("title") or "") + " " + (article.get("description") or "")
+
+def article_key(article):
+    if article.get("url"):
+        return article["url"]
+    return "sha1:" + hashlib.sha1(article_text(article).encode("utf-8")).hexdigest()
+
+def score_article_batches(article_lists):
+    """Average polarity per symbol for {symbol: [articles]}; returns {symbol: (avg_score, article_count)}.
+
+    A story that shows up under several symbols, or was scored on an earlier
+    call, is only scored once.
+    """
+    keys = {symbol: [article_key(a) for a in articles] for symbol, articles in article_lists.items()}
+
+    unscored = {}
+    for symbol, articles in article_lists.items():
+        for key, article in zip(keys[symbol], articles):
+            if key not in unscored and _article_scores.get(key) is None:
+                unscored[key] = article_text(article)
+
+    scores = {key: analyze_sentiment(text) for key, text in unscored.items()}
+    for key, score in scores.items():
+        _article_scores.set(key, score)
+    if unscored:
+        print(f"[DEBUG] Scored {len(unscored)} new articles for {len(article_lists)} symbols")
+
+    results = {}
+    for symbol, symbol_keys in keys.items():
+        values = [scores[key] if key in scores else _article_scores.get(key, 0) for key in symbol_keys]
+        results[symbol] = (sum(values) / len(values) if values else 0, len(values))
+    return results
+
+def load_stored_sentiments(symbols, max_age):
+    """{symbol: (decision, score, fetched_at)} for stored rows younger than max_age seconds, in one query."""
+    if not SENTIMENT_STORE_ENABLED or not symbols:
+        return {}
+    try:
+        from sqlmodel import Session, select
+        from db import engine
+        from models.news_sentiment import NewsSentiment
+
+        cutoff = datetime.utcnow() - timedelta(seconds=max_age)
+        with Session(engine) as session:
+            rows = session.exec(
+                select(NewsSentiment)
+                .where(NewsSentiment.symbol.in_(list(symbols)))
+                .where(NewsSentiment.fetched_at >= cutoff)
+            ).all()
+        return {row.symbol: (row.decision, row.score, row.fetched_at) for row in rows}
+    except Exception as e:
+        print(f"[WARN] Could not read stored sentiment for {len(symbols)} symbols: {e}")
+        return {}
+
+def _load_stored(symbol, max_age):
+    """Stored decision for symbol if it is younger than max_age seconds, else None."""
+    return load_stored_sentiments([symbol], max_age).get(symbol)
+
+def store_sentiment(symbol, decision, score, article_count, fetched_at=None):
+    if not SENTIMENT_STORE_ENABLED:
+        return
+    try:
+        from sqlmodel import Session, select
+        from db import engine
+        from models.news_sentiment import NewsSentiment
+
+        with Session(engine) as session:
+            row = session.exec(select(NewsSentiment).where(NewsSentiment.symbol == symbol)).first()
+            if row is None:
+                row = NewsSentiment(symbol=symbol, decision=decision, score=score)
+            row.decision = decision
+            row.score = float(score)
+            row.article_count = article_count
+            row.fetched_at = fetched_at or datetime.utcnow()
+            session.add(row)
+            session.commit()
+    except Exception as e:
+        print(f"[WARN] Could not store sentiment for {symbol}: {e}")
+
+
+def _cache_key(stock):
+    return stock.strip().upper()
+
+def _lookup(key, stock):
+    """("decision", (decision, score)) from the store, or ("articles", articles or None) from NewsAPI."""
+    stored = _load_stored(key, SENTIMENT_TTL)
+    if stored is not None:
+        decision, score, fetched_at = stored
+        print(f"[CACHE] Stored sentiment hit for {key}")
+        # Only keep it in memory for whatever is left of its TTL
+        remaining = SENTIMENT_TTL - (datetime.utcnow() - fetched_at).total_seconds()
+        _sentiment_cache.set(key, (decision, score), ttl=max(remaining, 1))
+        return "decision", (decision, score)
+    return "articles", fetch_news(stock)
+
+def _resolve(lookups):
+    """Turn {key: _lookup() result} into {key: (decision, score)}, scoring all articles in one batch."""
+    decisions, article_lists = {}, {}
+    for key, (kind, value) in lookups.items():
+        if kind == "decision":
+            decisions[key] = value
+        elif value is None:
+            # No API Key or API failed -> Safe fallback
+            decisions[key] = (NEUTRAL_DECISION, 0)
+            _sentiment_cache.set(key, decisions[key], ttl=SENTIMENT_FALLBACK_TTL)
+        else:
+            article_lists[key] = value
+
+    for key, (avg_score, article_count) in score_article_batches(article_lists).items():
+        decisions[key] = (decision_from_score(avg_score), avg_score)
+        _sentiment_cache.set(key, decisions[key])
+        store_sentiment(key, decisions[key][0], avg_score, article_count)
+    return decisions
+
+def _lookup_and_resolve(key, stock):
+    """(decision, score) for key. Runs once per coalesced group of callers, so scoring and storing happen once."""
+    return _resolve({key: _lookup(key, stock)})[key]
+
+def record_interest(stocks):
+    """Count a request for these symbols' news; callers pass only symbols that resolved to bars."""
+    with _interest_lock:
+        _interest.update({_cache_key(stock) for stock in stocks})
+        if len(_interest) > NEWS_INTEREST_MAX:
+            # Keep the most requested half so one-off symbols can't grow the counter without bound
+            kept = _interest.most_common(NEWS_INTEREST_MAX // 2)
+            _interest.clear()
+            _interest.update(dict(kept))
+
+def decay_interest():
+    """Halve every count (dropping symbols that reach zero), so popularity follows recent requests."""
+    with _interest_lock:
+        for symbol, count in list(_interest.items()):
+            if count > 1:
+                _interest[symbol] = count // 2
+            else:
+                del _interest[symbol]
+
+def popular_symbols(limit):
+    with _interest_lock:
+        return [symbol for symbol, _ in _interest.most_common(limit)]
+
+def get_news_decision(stock):
+    key = _cache_key(stock)
+    cached = _sentiment_cache.get(key)
+    if cached is not None:
+        return cached
+    # Concurrent requests for the same symbol share one fetch, score and store
+    return _sentiment_flights.do(key, _lookup_and_resolve, key, stock)
+
+def get_news_decisions(stocks, deadline=None):
+    """get_news_decision for many symbols at once, fetched concurrently.
+
+    Returns {symbol: (decision, score)}. Symbols still pending when the batch
+    deadline passes get the neutral decision; fetches already running finish
+    into the cache for the next request. Stories already scored under any
+    symbol are not scored again.
+    """
+    decisions, pending = {}, {}
+    for stock in dict.fromkeys(stocks):
+        key = _cache_key(stock)
+        cached = _sentiment_cache.get(key)
+        if cached is not None:
+            decisions[stock] = cached
+        elif key not in pending:
+            pending[key] = _news_pool.submit(_sentiment_flights.do, key, _lookup_and_resolve, key, stock)
+
+    if pending:
+        wait(pending.values(), timeout=NEWS_BATCH_DEADLINE if deadline is None else deadline)
+
+    resolved = {}
+    for key, future in pending.items():
+        if not future.done():
+            # Queued lookups are dropped; ones already running still score into the cache when they finish
+            future.cancel()
+            print(f"⚠️ News deadline passed for {key}, using neutral sentiment")
+        elif future.exception() is not None:
+            print(f"⚠️ News lookup failed for {key}: {future.exception()}")
+        else:
+            resolved[key] = future.result()
+
+    for stock in dict.fromkeys(stocks):
+        if stock not in decisions:
+            decisions[stock] = resolved.get(_cache_key(stock), (NEUTRAL_DECISION, 0))
+    return decisions
+
+def _fetch_articles(key, stock):
+    return "articles", fetch_news(stock)
+
+def refresh_news(stocks, deadline=None):
+    """Fetch and score fresh news for stocks, bypassing both cache tiers, and store the results.
+
+    Used by background ingestion; returns {symbol: (decision, score)} for the
+    symbols that finished before the deadline. Runs on its own small pool, so a
+    large refresh can't hold up get_news_decisions.
+    """
+    keys = list(dict.fromkeys(_cache_key(stock) for stock in stocks))
+    futures = {key: _refresh_pool.submit(_fetch_articles, key, key) for key in keys}
+    wait(futures.values(), timeout=NEWS_BATCH_DEADLINE if deadline is None else deadline)
+
+    lookups = {}
+    for key, future in futures.items():
+        if not future.done():
+            future.cancel()
+            print(f"⚠️ News refresh timed out for {key}")
+        elif future.exception() is not None:
+            print(f"⚠️ News refresh failed for {key}: {future.exception()}")
+        elif future.result()[1] is None:
+            # Keep whatever was stored before rather than overwriting it with the fallback
+            print(f"⚠️ No news fetched for {key}, keeping the previous sentiment")
+        else:
+            lookups[key] = future.result()
+    return _resolve(lookups)
 
 def clean_decision_text(text):
     import re
@@ -0,0 +1,129 @@
+# backend/services/short_term_rules.py
+#
+# The short-term scoring rules of /api/short-term-predict written as array code,
+# so a single symbol, a whole universe (screener) or every bar of a backtest all
+# go through exactly the same rules. Inputs broadcast: scalars, 1D per-symbol
+# arrays or 2D time x symbols arrays.
+
+import numpy as np
+
+TREND_BULLISH, TREND_BEARISH, TREND_REBOUND, TREND_FLAT = 0, 1, 2, 3
+TREND_LABELS = ("3D Bullish", "3D Bearish", "Rebound forming", "Flat or No Clear Trend")
+
+CONFIDENCE_LOW, CONFIDENCE_MEDIUM, CONFIDENCE_HIGH = 0, 1, 2
+CONFIDENCE_LABELS = ("🔴 Low", "🟡 Medium", "🟢 High")
+
+AVOID_BEARISH, AVOID, REVIEW, INVEST, INVEST_STRONGLY = 0, 1, 2, 3, 4
+DECISION_LABELS = (
+    "❌ Avoid (Low Interest or Bearish)",
+    "❌ Avoid",
+    "🤔 Review Further",
+    "✅ Invest",
+    "🚀 Invest Strongly",
+)
+
+# Sentiment score for a news decision with no news behind it
+NEUTRAL_SENTIMENT_SCORE = 70
+
+
+def news_sentiment_score(news_decision: str) -> int:
+    return 88 if "Positive" in news_decision else (70 if "Neutral" in news_decision else 50)
+
+
+def classify_trend(close_2, close_1, close_0):
+    """Trend codes from the closes two bars ago, one bar ago and now."""
+    close_2, close_1, close_0 = np.asarray(close_2), np.asarray(close_1), np.asarray(close_0)
+    return np.select(
+        [
+            (close_0 > close_1) & (close_1 > close_2),
+            (close_0 < close_1) & (close_1 < close_2),
+            (close_0 > close_1) & (close_1 < close_2),
+        ],
+        [TREND_BULLISH, TREND_BEARISH, TREND_REBOUND],
+        default=TREND_FLAT,
+    )
+
+
+def volume_spike(latest_volume, avg_volume):
+    """% change of the latest volume against the average, rounded like the API reports it."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.round((np.asarray(latest_volume, dtype=float) - avg_volume) / avg_volume * 100, 1)
+
+
+def score_signals(trend, rsi, spike, sentiment_score, positive_news):
+    """Apply the short-term rules; returns (score, confidence code, decision code) arrays.
+
+    NaN RSI or volume spike values fail every comparison, as they do in the scalar rules.
+    """
+    trend = np.asarray(trend)
+    rsi = np.asarray(rsi, dtype=float)
+    spike = np.asarray(spike, dtype=float)
+    sentiment_score = np.asarray(sentiment_score)
+    positive_news = np.asarray(positive_news, dtype=bool)
+
+    bullish = trend == TREND_BULLISH
+    bearish = trend == TREND_BEARISH
+    rebound = trend == TREND_REBOUND
+
+    high = (sentiment_score >= 85) & (spike > 50) & bullish & (rsi < 70)
+    medium = (
+        ((sentiment_score >= 70) & (spike > 10) & bullish)
+        | (rebound & (sentiment_score >= 70) & (rsi < 65))
+        | (rebound & positive_news & (rsi < 75) & (spike > -70))
+        | (positive_news & (spike > -50))
+    )
+    confidence = np.where(high, CONFIDENCE_HIGH, np.where(medium, CONFIDENCE_MEDIUM, CONFIDENCE_LOW))
+
+    score = (
+        2 * bullish
+        + (rsi < 30)
+        + 2 * (sentiment_score > 80)
+        + (spike > 10)
+        + 2 * (confidence == CONFIDENCE_HIGH)
+        + (confidence == CONFIDENCE_MEDIUM)
+        + (rebound & (rsi < 40))
+    ).astype(int)
+
+    avoid_bearish = (spike < -50) | (bearish & (confidence == CONFIDENCE_LOW))
+    decision = np.select(
+        [avoid_bearish, score >= 6, score >= 4, score >= 2],
+        [AVOID_BEARISH, INVEST_STRONGLY, INVEST, REVIEW],
+        default=AVOID,
+    )
+    return score, confidence, decision
+
+
+# "Signals" rules: an RSI-based technical call plus a news score (replayed by backtest rules="signals")
+SIGNAL_BUY_OPPORTUNITY, SIGNAL_INVEST, SIGNAL_OVERBOUGHT, SIGNAL_AVOID = 0, 1, 2, 3
+SIGNAL_TECH_LABELS = ("✅ Invest (Buy Opportunity)", "✅ Invest", "⚠️ Hold (Overbought)", "❌ Avoid")
+SIGNAL_TECH_SCORES = np.array([9, 7, 4, 1])
+
+SIGNAL_HOLD_OR_AVOID, SIGNAL_REVIEW, SIGNAL_FINAL_INVEST, SIGNAL_INVEST_STRONGLY = 0, 1, 2, 3
+SIGNAL_DECISION_LABELS = ("Hold or Avoid", "Review Further", "Invest", "Invest Strongly")
+
+
+def news_signal_score(news_decision: str) -> int:
+    if "Positive" in news_decision:
+        return 8
+    if "Neutral" in news_decision:
+        return 5
+    if "Negative" in news_decision:
+        return 2
+    return 0
+
+
+def score_technical_signals(rsi, news_score, expected_up=True):
+    """(technical code, total score, final decision code) arrays for the signal rules."""
+    rsi = np.asarray(rsi, dtype=float)
+    tech = np.select(
+        [~np.asarray(expected_up, dtype=bool), rsi < 30, rsi > 70],
+        [SIGNAL_AVOID, SIGNAL_BUY_OPPORTUNITY, SIGNAL_OVERBOUGHT],
+        default=SIGNAL_INVEST,
+    )
+    total = SIGNAL_TECH_SCORES[tech] + np.asarray(news_score)
+    decision = np.select(
+        [total >= 14, total >= 11, total >= 8],
+        [SIGNAL_INVEST_STRONGLY, SIGNAL_FINAL_INVEST, SIGNAL_REVIEW],
+        default=SIGNAL_HOLD_OR_AVOID,
+    )
+    return tech, total, decision
@@ -1,5 +1,5 @@
-import numpy as np
 import pandas as pd
+from backend.services.helpers.technical_indicators import compute_indicators
 
 def compute_short_term_signals(stock_data):
     try:
@@ -7,34 +7,26 @@ def compute_short_term_signals(stock_data):
             return {"error": "No valid 'Close' data available."}
 
         # Drop NaNs in 'Close'
-        close = stock_data["Close"].dropna()
+        close = stock_data["Close"].dropna().to_numpy(dtype=float)
 
         if len(close) < 15:
             return {"error": "Not enough data to compute indicators."}
 
-        # Calculate RSI
-        delta = close.diff()
-        gain = delta.where(delta > 0, 0.0)
-        loss = -delta.where(delta < 0, 0.0)
-        avg_gain = gain.rolling(window=14).mean()
-        avg_loss = loss.rolling(window=14).mean()
-        rs = avg_gain / avg_loss
-        rsi = 100 - (100 / (1 + rs))
+        # RSI and annualised log-return volatility in one pass
+        ind = compute_indicators(close, indicators=("rsi", "log_volatility"))
+        rsi = ind["rsi"][-1]
+        volatility = ind["log_volatility"][-1]
 
-        # Calculate volatility
-        log_returns = np.log(close / close.shift(1))
-        volatility = log_returns.rolling(window=14).std() * np.sqrt(252)
-
-        if pd.isna(rsi.iloc[-1]) or pd.isna(volatility.iloc[-1]):
+        if pd.isna(rsi) or pd.isna(volatility):
             return {"error": "Indicators resulted in NaN. Possibly insufficient data."}
 
         # Simple prediction logic
-        decision = "Buy" if rsi.iloc[-1] < 30 else "Sell" if rsi.iloc[-1] > 70 else "Hold"
-        confidence_score = round(1 - abs(rsi.iloc[-1] - 50) / 50, 2)
+        decision = "Buy" if rsi < 30 else "Sell" if rsi > 70 else "Hold"
+        confidence_score = round(1 - abs(rsi - 50) / 50, 2)
 
         return {
-            "rsi": round(rsi.iloc[-1], 2),
-            "volatility": round(volatility.iloc[-1], 4),
+            "rsi": round(rsi, 2),
+            "volatility": round(volatility, 4),
             "decision": decision,
             "confidence_score": confidence_score
         }
@@ -0,0 +1,74 @@
+# backend/services/worker_pool.py
+#
+# Shared process pools for CPU-bound work (simulations, model training) so that
+# sync handlers stop pinning a single core while the rest of the box idles.
+
+import multiprocessing
+import os
+import threading
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+SIMULATION_WORKERS = int(os.getenv("SIMULATION_WORKERS", os.cpu_count() or 1))
+# LSTM training already uses several threads per run, so only a couple of runs at once
+TRAINING_WORKERS = int(os.getenv("TRAINING_WORKERS", 2))
+# Per-request cap on concurrently running jobs, so one big request can't starve the others
+MAX_PARALLEL_SYMBOLS = int(os.getenv("MAX_PARALLEL_SYMBOLS", 8))
+# Pools start lazily inside a server that already runs threads (news fetches, predictions, request
+# handlers); forking it could copy a lock some thread holds, so workers come from a clean forkserver
+POOL_START_METHOD = os.getenv("POOL_START_METHOD", "forkserver")
+
+_pools: dict[str, ProcessPoolExecutor] = {}
+_lock = threading.Lock()
+
+
+def get_pool(name: str, max_workers: int) -> ProcessPoolExecutor:
+    with _lock:
+        if name not in _pools:
+            print(f"[DEBUG] Starting '{name}' process pool with {max_workers} workers")
+            _pools[name] = ProcessPoolExecutor(
+                max_workers=max_workers,
+                mp_context=multiprocessing.get_context(POOL_START_METHOD),
+            )
+        return _pools[name]
+
+
+def reset_pool(name: str):
+    with _lock:
+        pool = _pools.pop(name, None)
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def map_bounded(name: str, max_workers: int, fn, jobs: list[tuple], limit: int) -> list:
+    """fn(*job) for every job on the named pool, at most `limit` in flight, results in job order."""
+    if not jobs:
+        return []
+    if len(jobs) == 1:
+        # Not worth the pickling round-trip
+        return [fn(*jobs[0])]
+
+    pool = get_pool(name, max_workers)
+    results = [None] * len(jobs)
+    queue = iter(enumerate(jobs))
+    pending = {}
+
+    def submit_next():
+        item = next(queue, None)
+        if item is not None:
+            index, job = item
+            pending[pool.submit(fn, *job)] = index
+
+    try:
+        for _ in range(max(1, limit)):
+            submit_next()
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                results[pending.pop(future)] = future.result()
+                submit_next()
+    except BrokenProcessPool:
+        print(f"[ERROR] '{name}' process pool died, restarting it on next use")
+        reset_pool(name)
+        raise
+    return results